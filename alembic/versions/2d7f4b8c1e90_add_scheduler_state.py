@@ -0,0 +1,32 @@
+"""Add scheduler selection and FSRS card state
+
+Revision ID: 2d7f4b8c1e90
+Revises: 9e3b5f0a6c12
+Create Date: 2026-10-18 11:42:03.517209
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d7f4b8c1e90'
+down_revision: Union[str, None] = '9e3b5f0a6c12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('algo_configs', sa.Column('scheduler', sa.String(length=20), server_default='sm2', nullable=False))
+    op.add_column('algo_configs', sa.Column('desired_retention', sa.Float(), server_default='0.9', nullable=False))
+    op.add_column('card_retention_data', sa.Column('stability', sa.Float(), nullable=True))
+    op.add_column('card_retention_data', sa.Column('difficulty', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('card_retention_data', 'difficulty')
+    op.drop_column('card_retention_data', 'stability')
+    op.drop_column('algo_configs', 'desired_retention')
+    op.drop_column('algo_configs', 'scheduler')
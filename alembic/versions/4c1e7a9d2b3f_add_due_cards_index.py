@@ -0,0 +1,26 @@
+"""Add due cards index
+
+Revision ID: 4c1e7a9d2b3f
+Revises: bb5860ec271d
+Create Date: 2026-10-18 09:12:41.203117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1e7a9d2b3f'
+down_revision: Union[str, None] = 'bb5860ec271d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_card_retention_data_user_next_review', 'card_retention_data', ['user_id', 'next_review', 'card_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_card_retention_data_user_next_review', table_name='card_retention_data')
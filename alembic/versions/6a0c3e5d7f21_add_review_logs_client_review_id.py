@@ -0,0 +1,28 @@
+"""Add client review id to review logs
+
+Revision ID: 6a0c3e5d7f21
+Revises: 2d7f4b8c1e90
+Create Date: 2026-10-18 13:20:41.093716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a0c3e5d7f21'
+down_revision: Union[str, None] = '2d7f4b8c1e90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('review_logs', sa.Column('client_review_id', sa.String(length=36), nullable=True))
+    op.create_index('uq_review_logs_user_client_review', 'review_logs', ['user_id', 'client_review_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_review_logs_user_client_review', table_name='review_logs')
+    op.drop_column('review_logs', 'client_review_id')
@@ -0,0 +1,26 @@
+"""Add progress status index
+
+Revision ID: 9e3b5f0a6c12
+Revises: 4c1e7a9d2b3f
+Create Date: 2026-10-18 10:05:17.884512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3b5f0a6c12'
+down_revision: Union[str, None] = '4c1e7a9d2b3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_card_retention_data_user_status', 'card_retention_data', ['user_id', 'status', 'next_review'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_card_retention_data_user_status', table_name='card_retention_data')
@@ -0,0 +1,26 @@
+"""Add review logs user reviewed_at index
+
+Revision ID: b4e8d1f3a957
+Revises: 6a0c3e5d7f21
+Create Date: 2026-10-18 14:02:55.310482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e8d1f3a957'
+down_revision: Union[str, None] = '6a0c3e5d7f21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_review_logs_user_reviewed_at', 'review_logs', ['user_id', 'reviewed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_review_logs_user_reviewed_at', table_name='review_logs')
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
@@ -11,6 +11,8 @@ from app.schemas.classroom import (
 from app.repositories.classroom_repository import (
     ClassRepository, ClassDecksRepository, ClassMembersRepository
 )
+from app.schemas.learning import ForecastResponse
+from app.services.learning_service import LearningService
 
 router = APIRouter()
 
@@ -199,6 +201,29 @@ async def get_class_exams(
     return result
 
 
+@router.get("/{class_id}/forecast", response_model=ForecastResponse)
+async def get_class_forecast(
+    class_id: int,
+    days: int = Query(30, ge=1, le=365),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Cards of the class decks due on each of the next `days` days, summed over all members"""
+    class_obj = ClassRepository.get_by_id(db, class_id)
+    if not class_obj:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Class not found")
+    
+    # Check access - teacher or member can view
+    if class_obj.teacher_id != current_user.id:
+        if not ClassMembersRepository.is_member(db, class_id, current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to view the forecast of this class"
+            )
+    
+    return LearningService.get_forecast(db, days, class_id=class_id)
+
+
 @router.delete("/{class_id}/decks/{deck_id}")
 async def remove_deck_from_class(
     class_id: int,
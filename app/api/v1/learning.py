@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from app.core.database import get_db
 from app.core.dependencies import get_current_student
 from app.models.user import User
 from app.schemas.learning import (
     ReviewLogCreate, ReviewLogResponse,
     StudyProgressResponse, AlgoConfigsResponse, AlgoConfigsUpdate,
-    CardRetentionDataResponse
+    CardRetentionDataResponse, BatchReviewRequest, BatchReviewResponse,
+    ForecastResponse, StudySessionResponse, SyncRequest, SyncResponse
 )
 from app.services.learning_service import LearningService
 from app.repositories.learning_repository import ReviewLogsRepository, CardRetentionDataRepository
@@ -40,16 +42,61 @@ async def review_card(
     return result
 
 
+@router.post("/review/batch", response_model=BatchReviewResponse)
+async def review_cards_batch(
+    batch: BatchReviewRequest,
+    current_user: User = Depends(get_current_student),
+    db: Session = Depends(get_db)
+):
+    """Submit a queue of reviews in one transaction"""
+    return LearningService.review_cards_batch(db, current_user.id, batch.reviews)
+
+
+@router.post("/sync", response_model=SyncResponse)
+async def sync_reviews(
+    sync: SyncRequest,
+    current_user: User = Depends(get_current_student),
+    db: Session = Depends(get_db)
+):
+    """Upload reviews recorded offline.
+    
+    Safe to retry: each client_review_id is applied once. Returns the retention rows that changed.
+    """
+    return LearningService.sync_reviews(db, current_user.id, sync.reviews)
+
+
 @router.get("/due-cards", response_model=List[CardRetentionDataResponse])
 async def get_due_cards(
+    response: Response,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
-    """Get cards due for review"""
-    due_cards = LearningService.get_due_cards(db, current_user.id)
+    """Get cards due for review, most overdue first.
+    
+    When more cards are due, the X-Next-Cursor header holds the cursor for the next page.
+    """
+    due_cards, next_cursor = LearningService.get_due_cards_page(db, current_user.id, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return due_cards
 
 
+@router.get("/study-session", response_model=StudySessionResponse)
+async def get_study_session(
+    limit: int = Query(50, ge=1, le=500),
+    new_cards: int = Query(10, ge=0, le=100),
+    deck_id: Optional[int] = None,
+    current_user: User = Depends(get_current_student),
+    db: Session = Depends(get_db)
+):
+    """Cards for one study session, with their content: up to `limit` due cards, most overdue
+    first, mixed with up to `new_cards` never-reviewed cards from the user's own and class decks.
+    """
+    return LearningService.get_study_session(db, current_user.id, limit, new_cards, deck_id)
+
+
 @router.get("/progress", response_model=StudyProgressResponse)
 async def get_study_progress(
     current_user: User = Depends(get_current_student),
@@ -59,15 +106,48 @@ async def get_study_progress(
     return LearningService.get_study_progress(db, current_user.id)
 
 
+@router.get("/forecast", response_model=ForecastResponse)
+async def get_forecast(
+    days: int = Query(30, ge=1, le=365),
+    current_user: User = Depends(get_current_student),
+    db: Session = Depends(get_db)
+):
+    """Number of cards due on each of the next `days` days"""
+    return LearningService.get_forecast(db, days, user_id=current_user.id)
+
+
 @router.get("/review-logs", response_model=List[ReviewLogResponse])
 async def get_review_logs(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_student),
+    db: Session = Depends(get_db)
+):
+    """Get review history, newest first.
+    
+    Page with the cursor from the X-Next-Cursor header; skip is kept for old clients.
+    """
+    logs, next_cursor = LearningService.get_review_logs_page(db, current_user.id, limit, cursor, skip)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return logs
+
+
+@router.get("/review-logs/export")
+async def export_review_logs(
+    format: Literal["ndjson", "csv"] = "ndjson",
     current_user: User = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
-    """Get review history"""
-    return ReviewLogsRepository.get_by_user(db, current_user.id, skip, limit)
+    """Download the full review history (oldest first), streamed as NDJSON or CSV"""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        LearningService.export_review_logs(db, current_user.id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="review-logs.{format}"'}
+    )
 
 
 @router.get("/algo-config", response_model=AlgoConfigsResponse)
@@ -86,9 +166,22 @@ async def get_algo_config(
 @router.put("/algo-config", response_model=AlgoConfigsResponse)
 async def update_algo_config(
     config_update: AlgoConfigsUpdate,
+    response: Response,
+    reschedule: bool = False,
     current_user: User = Depends(get_current_student),
     db: Session = Depends(get_db)
 ):
-    """Change spaced repetition algorithm settings"""
-    return LearningService.update_algo_config(db, current_user.id, config_update)
+    """Change spaced repetition algorithm settings.
+    
+    With reschedule=true, existing cards are moved onto the new settings as well;
+    the number of cards whose interval changed is returned in X-Rescheduled-Cards.
+    """
+    if not reschedule:
+        return LearningService.update_algo_config(db, current_user.id, config_update)
+    
+    algo_config, rescheduled = LearningService.update_algo_config_and_reschedule(
+        db, current_user.id, config_update
+    )
+    response.headers["X-Rescheduled-Cards"] = str(rescheduled)
+    return algo_config
 
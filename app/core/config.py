@@ -15,6 +15,12 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     API_V1_PREFIX: str = "/api/v1"
     
+    # Review log write-behind buffer (off: every review inserts its log in its own transaction)
+    REVIEW_LOG_BUFFER_ENABLED: bool = False
+    REVIEW_LOG_BUFFER_MAX_ROWS: int = 500
+    REVIEW_LOG_BUFFER_MAX_DELAY_MS: int = 200
+    REVIEW_LOG_BUFFER_MAX_PENDING: int = 5000
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, BIGINT, Integer
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -14,6 +14,10 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# SQLite only auto-increments INTEGER PRIMARY KEY columns, so BIGINT ids
+# fall back to INTEGER there (tests and local runs use SQLite)
+BigIntPK = BIGINT().with_variant(Integer, "sqlite")
+
 
 def get_db():
     db = SessionLocal()
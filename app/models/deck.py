@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, BIGINT
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, BigIntPK
 
 
 class Deck(Base):
@@ -26,7 +26,7 @@ class Deck(Base):
 class Flashcard(Base):
     __tablename__ = "flashcards"
 
-    id = Column(BIGINT, primary_key=True, index=True, autoincrement=True)
+    id = Column(BigIntPK, primary_key=True, index=True, autoincrement=True)
     deck_id = Column(Integer, ForeignKey("decks.id", ondelete="CASCADE"), nullable=False)
     front_content = Column(Text, nullable=False)
     back_content = Column(Text, nullable=False)
@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, BIGINT, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, BigIntPK
 
 
 class Exam(Base):
@@ -36,7 +36,7 @@ class ExamAssignment(Base):
 class ExamResult(Base):
     __tablename__ = "exam_results"
 
-    id = Column(BIGINT, primary_key=True, index=True, autoincrement=True)
+    id = Column(BigIntPK, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     exam_id = Column(Integer, ForeignKey("exams.id", ondelete="CASCADE"), nullable=False)
     score = Column(Float, nullable=False)
@@ -50,7 +50,7 @@ class ExamResult(Base):
 class Question(Base):
     __tablename__ = "questions"
 
-    id = Column(BIGINT, primary_key=True, index=True, autoincrement=True)
+    id = Column(BigIntPK, primary_key=True, index=True, autoincrement=True)
     exam_id = Column(Integer, ForeignKey("exams.id", ondelete="CASCADE"), nullable=False)
     content = Column(String(500), nullable=False)
     options_json = Column(JSON, nullable=False)
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, DateTime, Float, Date, ForeignKey, BIGINT, Enum
+from sqlalchemy import Column, Integer, DateTime, Float, Date, ForeignKey, BIGINT, Enum, Index, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, BigIntPK
 import enum
 
 
@@ -23,6 +23,16 @@ class CardRetentionData(Base):
     ease_factor = Column(Float, default=2.5)
     repetition_count = Column(Integer, default=0)
     status = Column(Enum(CardStatus), default=CardStatus.NEW)
+    # FSRS memory state; NULL for cards only ever scheduled by SM-2
+    stability = Column(Float, nullable=True)
+    difficulty = Column(Float, nullable=True)
+
+    __table_args__ = (
+        # Due-card lookups and keyset pagination ordered by next_review
+        Index("ix_card_retention_data_user_next_review", "user_id", "next_review", "card_id"),
+        # Study progress counts per status (next_review makes the due count index-only)
+        Index("ix_card_retention_data_user_status", "user_id", "status", "next_review"),
+    )
 
     user = relationship("User", back_populates="card_retention_data")
     flashcard = relationship("Flashcard", back_populates="retention_data")
@@ -31,12 +41,20 @@ class CardRetentionData(Base):
 class ReviewLogs(Base):
     __tablename__ = "review_logs"
 
-    id = Column(BIGINT, primary_key=True, index=True, autoincrement=True)
+    id = Column(BigIntPK, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     card_id = Column(BIGINT, ForeignKey("flashcards.id", ondelete="CASCADE"), nullable=False)
     quality = Column(Integer, nullable=False)  # 0-5
     study_time_ms = Column(Integer, nullable=False)
     reviewed_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set by offline clients so replayed reviews are stored once
+    client_review_id = Column(String(36), nullable=True)
+
+    __table_args__ = (
+        Index("uq_review_logs_user_client_review", "user_id", "client_review_id", unique=True),
+        # History pages and exports ordered by (reviewed_at, id); id rides along as the row key
+        Index("ix_review_logs_user_reviewed_at", "user_id", "reviewed_at"),
+    )
 
     user = relationship("User", back_populates="review_logs")
     flashcard = relationship("Flashcard", back_populates="review_logs")
@@ -63,6 +81,8 @@ class AlgoConfigs(Base):
     interval_modifier = Column(Float, default=1.0)
     easy_bonus = Column(Float, default=1.3)
     hard_interval = Column(Float, default=1.2)
+    scheduler = Column(String(20), nullable=False, default="sm2", server_default="sm2")
+    desired_retention = Column(Float, nullable=False, default=0.9, server_default="0.9")
 
     user = relationship("User", back_populates="algo_configs")
 
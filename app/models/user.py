@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, DateTime, Enum, Boolean, Text, Time, ForeignKey, BIGINT
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.core.database import Base
+from app.core.database import Base, BigIntPK
 import enum
 
 
@@ -70,7 +70,7 @@ class UserPreferences(Base):
 class NotificationLogs(Base):
     __tablename__ = "notification_logs"
 
-    id = Column(BIGINT, primary_key=True, index=True, autoincrement=True)
+    id = Column(BigIntPK, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     message = Column(Text, nullable=False)
     type = Column(Enum(NotificationType), nullable=False)
@@ -1,6 +1,9 @@
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Dict, Iterable
 from app.models.deck import Deck, Flashcard, UserFavoriteDecks
+from app.models.classroom import ClassDecks, ClassMembers
+from app.models.learning import CardRetentionData, CardStatus
 from app.schemas.deck import DeckCreate, DeckUpdate, FlashcardCreate, FlashcardUpdate
 
 
@@ -92,6 +95,39 @@ class FlashcardRepository:
     def get_by_id(db: Session, flashcard_id: int) -> Optional[Flashcard]:
         return db.query(Flashcard).filter(Flashcard.id == flashcard_id).first()
     
+    @staticmethod
+    def get_deck_ids(db: Session, flashcard_ids: Iterable[int]) -> Dict[int, int]:
+        """Map each existing flashcard id to its deck id in one query"""
+        flashcard_ids = list(flashcard_ids)
+        if not flashcard_ids:
+            return {}
+        rows = db.query(Flashcard.id, Flashcard.deck_id).filter(Flashcard.id.in_(flashcard_ids)).all()
+        return {row.id: row.deck_id for row in rows}
+    
+    @staticmethod
+    def get_new_for_user(db: Session, user_id: int, limit: int, deck_id: Optional[int] = None) -> List[Flashcard]:
+        """Cards the user has never reviewed, from their own decks and the decks of their classes.
+        
+        With deck_id, only that deck, which may also be any public deck.
+        """
+        class_deck_ids = select(ClassDecks.deck_id).join(
+            ClassMembers, ClassMembers.class_id == ClassDecks.class_id
+        ).where(ClassMembers.student_id == user_id)
+        if deck_id is not None:
+            deck_ids = select(Deck.id).where(
+                Deck.id == deck_id,
+                or_(Deck.owner_id == user_id, Deck.is_public.is_(True), Deck.id.in_(class_deck_ids))
+            )
+        else:
+            deck_ids = select(Deck.id).where(Deck.owner_id == user_id).union(class_deck_ids)
+        return db.query(Flashcard).outerjoin(
+            CardRetentionData,
+            and_(CardRetentionData.user_id == user_id, CardRetentionData.card_id == Flashcard.id)
+        ).filter(
+            Flashcard.deck_id.in_(deck_ids),
+            or_(CardRetentionData.card_id.is_(None), CardRetentionData.status == CardStatus.NEW)
+        ).order_by(Flashcard.deck_id, Flashcard.id).limit(limit).all()
+    
     @staticmethod
     def get_by_deck(db: Session, deck_id: int) -> List[Flashcard]:
         return db.query(Flashcard).filter(Flashcard.deck_id == deck_id).all()
@@ -1,7 +1,10 @@
+from sqlalchemy import insert, update, select, bindparam, type_coerce, String, Date, and_, or_, func, case
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Optional, List, Iterable, Tuple, Dict
 from datetime import datetime, date
-from app.models.learning import CardRetentionData, ReviewLogs, UserStats, AlgoConfigs
+from app.models.learning import CardRetentionData, ReviewLogs, UserStats, AlgoConfigs, CardStatus
+from app.models.classroom import ClassDecks, ClassMembers
+from app.models.deck import Flashcard
 from app.schemas.learning import (
     CardRetentionDataCreate, CardRetentionDataUpdate,
     ReviewLogCreate, UserStatsCreate, UserStatsUpdate,
@@ -9,6 +12,16 @@ from app.schemas.learning import (
 )
 
 
+def _save(db: Session, instance=None, commit: bool = True) -> None:
+    """Commit and refresh, or only flush when the caller owns the transaction"""
+    if commit:
+        db.commit()
+        if instance is not None:
+            db.refresh(instance)
+    else:
+        db.flush()
+
+
 class CardRetentionDataRepository:
     @staticmethod
     def get_by_user_and_card(db: Session, user_id: int, card_id: int) -> Optional[CardRetentionData]:
@@ -18,7 +31,24 @@ class CardRetentionDataRepository:
         ).first()
     
     @staticmethod
-    def create_or_update(db: Session, retention_data: CardRetentionDataCreate) -> CardRetentionData:
+    def get_by_user_and_cards(db: Session, user_id: int, card_ids: Iterable[int]) -> List[CardRetentionData]:
+        card_ids = list(card_ids)
+        if not card_ids:
+            return []
+        return db.query(CardRetentionData).filter(
+            CardRetentionData.user_id == user_id,
+            CardRetentionData.card_id.in_(card_ids)
+        ).all()
+    
+    @staticmethod
+    def create(db: Session, retention_data: CardRetentionDataCreate, commit: bool = True) -> CardRetentionData:
+        db_retention = CardRetentionData(**retention_data.model_dump())
+        db.add(db_retention)
+        _save(db, db_retention, commit)
+        return db_retention
+    
+    @staticmethod
+    def create_or_update(db: Session, retention_data: CardRetentionDataCreate, commit: bool = True) -> CardRetentionData:
         existing = CardRetentionDataRepository.get_by_user_and_card(
             db, retention_data.user_id, retention_data.card_id
         )
@@ -27,57 +57,238 @@ class CardRetentionDataRepository:
             update_data = retention_data.model_dump(exclude_unset=True, exclude={"user_id", "card_id"})
             for field, value in update_data.items():
                 setattr(existing, field, value)
-            db.commit()
-            db.refresh(existing)
+            _save(db, existing, commit)
             return existing
         else:
-            db_retention = CardRetentionData(**retention_data.model_dump())
-            db.add(db_retention)
-            db.commit()
-            db.refresh(db_retention)
-            return db_retention
+            return CardRetentionDataRepository.create(db, retention_data, commit)
     
     @staticmethod
-    def update(db: Session, user_id: int, card_id: int, update_data: CardRetentionDataUpdate) -> Optional[CardRetentionData]:
+    def update(db: Session, user_id: int, card_id: int, update_data: CardRetentionDataUpdate, commit: bool = True) -> Optional[CardRetentionData]:
         retention = CardRetentionDataRepository.get_by_user_and_card(db, user_id, card_id)
         if not retention:
             return None
-        
+        return CardRetentionDataRepository.update_instance(db, retention, update_data, commit)
+    
+    @staticmethod
+    def update_instance(db: Session, retention: CardRetentionData, update_data: CardRetentionDataUpdate, commit: bool = True) -> CardRetentionData:
         update_dict = update_data.model_dump(exclude_unset=True)
         for field, value in update_dict.items():
             setattr(retention, field, value)
         
-        db.commit()
-        db.refresh(retention)
+        _save(db, retention, commit)
         return retention
     
     @staticmethod
-    def get_due_cards(db: Session, user_id: int) -> List[CardRetentionData]:
+    def get_due_cards(
+        db: Session,
+        user_id: int,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[CardRetentionData]:
+        """Due cards ordered by (next_review, card_id), resuming after the given key"""
         now = datetime.utcnow()
-        return db.query(CardRetentionData).filter(
+        query = db.query(CardRetentionData).filter(
             CardRetentionData.user_id == user_id,
             CardRetentionData.next_review <= now
-        ).all()
+        )
+        if after:
+            after_review, after_card_id = after
+            query = query.filter(or_(
+                CardRetentionData.next_review > after_review,
+                and_(
+                    CardRetentionData.next_review == after_review,
+                    CardRetentionData.card_id > after_card_id
+                )
+            ))
+        query = query.order_by(CardRetentionData.next_review, CardRetentionData.card_id)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+    
+    @staticmethod
+    def get_due_with_cards(
+        db: Session,
+        user_id: int,
+        limit: int,
+        deck_id: Optional[int] = None
+    ) -> List[Tuple[CardRetentionData, Flashcard]]:
+        """Due cards, most overdue first, together with their flashcard content in one query"""
+        query = db.query(CardRetentionData, Flashcard).join(
+            Flashcard, Flashcard.id == CardRetentionData.card_id
+        ).filter(
+            CardRetentionData.user_id == user_id,
+            CardRetentionData.next_review <= datetime.utcnow()
+        )
+        if deck_id is not None:
+            query = query.filter(Flashcard.deck_id == deck_id)
+        return query.order_by(CardRetentionData.next_review, CardRetentionData.card_id).limit(limit).all()
     
     @staticmethod
     def get_by_user(db: Session, user_id: int) -> List[CardRetentionData]:
         return db.query(CardRetentionData).filter(CardRetentionData.user_id == user_id).all()
+    
+    @staticmethod
+    def get_schedule_columns(db: Session, user_id: int, with_last_quality: bool = False) -> list:
+        """Scheduling columns of every passed card, optionally with the quality of its last review"""
+        columns = [
+            CardRetentionData.card_id,
+            CardRetentionData.interval_days,
+            CardRetentionData.repetition_count,
+            # Raw driver value (string on SQLite); callers parse the column in bulk
+            type_coerce(CardRetentionData.last_review, String).label("last_review")
+        ]
+        stmt = select(*columns).where(
+            CardRetentionData.user_id == user_id,
+            CardRetentionData.status.in_([CardStatus.LEARNING, CardStatus.REVIEW]),
+            CardRetentionData.repetition_count >= 1,
+            CardRetentionData.last_review.isnot(None)
+        )
+        if with_last_quality:
+            last_log = select(
+                ReviewLogs.card_id,
+                func.max(ReviewLogs.id).label("log_id")
+            ).where(ReviewLogs.user_id == user_id).group_by(ReviewLogs.card_id).subquery()
+            stmt = stmt.add_columns(ReviewLogs.quality).outerjoin(
+                last_log, last_log.c.card_id == CardRetentionData.card_id
+            ).outerjoin(ReviewLogs, ReviewLogs.id == last_log.c.log_id)
+        return db.execute(stmt).all()
+    
+    @staticmethod
+    def bulk_update_schedule(db: Session, rows: List[dict], commit: bool = True) -> int:
+        """Executemany UPDATE of interval_days/next_review keyed by (user_id, card_id).
+        
+        Goes straight to the table, so retention objects already loaded in the session are not refreshed.
+        """
+        if rows:
+            table = CardRetentionData.__table__
+            stmt = update(table).where(
+                table.c.user_id == bindparam("key_user_id"),
+                table.c.card_id == bindparam("key_card_id")
+            ).values(
+                interval_days=bindparam("interval_days"),
+                next_review=bindparam("next_review")
+            )
+            db.connection().execute(stmt, rows)
+        _save(db, commit=commit)
+        return len(rows)
+    
+    @staticmethod
+    def get_status_counts(db: Session, user_id: int, now: datetime) -> Tuple[Dict[CardStatus, int], int]:
+        """Card count per status and number of due cards, in one grouped query"""
+        rows = db.query(
+            CardRetentionData.status,
+            func.count(),
+            func.sum(case((CardRetentionData.next_review <= now, 1), else_=0))
+        ).filter(
+            CardRetentionData.user_id == user_id
+        ).group_by(CardRetentionData.status).all()
+        
+        counts = {row_status: count for row_status, count, _ in rows}
+        due = sum(due_count or 0 for _, _, due_count in rows)
+        return counts, due
+    
+    @staticmethod
+    def get_due_histogram(
+        db: Session,
+        before: datetime,
+        user_id: Optional[int] = None,
+        class_id: Optional[int] = None
+    ) -> List[Tuple[date, int]]:
+        """(day, cards due) for every day with a next_review before `before`, counted in the database.
+        
+        With class_id, counts the cards of the class decks across all class members.
+        """
+        day = func.date(CardRetentionData.next_review, type_=Date)
+        query = db.query(day, func.count()).filter(CardRetentionData.next_review < before)
+        if user_id is not None:
+            query = query.filter(CardRetentionData.user_id == user_id)
+        if class_id is not None:
+            query = query.join(
+                ClassMembers,
+                and_(ClassMembers.student_id == CardRetentionData.user_id, ClassMembers.class_id == class_id)
+            ).join(
+                Flashcard, Flashcard.id == CardRetentionData.card_id
+            ).join(
+                ClassDecks,
+                and_(ClassDecks.deck_id == Flashcard.deck_id, ClassDecks.class_id == class_id)
+            )
+        return query.group_by(day).order_by(day).all()
 
 
 class ReviewLogsRepository:
     @staticmethod
-    def create(db: Session, review_log: ReviewLogCreate) -> ReviewLogs:
-        db_review = ReviewLogs(**review_log.model_dump())
+    def create(db: Session, review_log: ReviewLogCreate, commit: bool = True) -> ReviewLogs:
+        db_review = ReviewLogs(**review_log.model_dump(exclude_none=True))
         db.add(db_review)
-        db.commit()
-        db.refresh(db_review)
+        _save(db, db_review, commit)
         return db_review
     
     @staticmethod
-    def get_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[ReviewLogs]:
-        return db.query(ReviewLogs).filter(
+    def bulk_create(db: Session, review_logs: List[ReviewLogCreate], commit: bool = True) -> int:
+        if not review_logs:
+            return 0
+        # Single multi-row INSERT instead of one INSERT + refresh per log
+        db.execute(insert(ReviewLogs), [log.model_dump(exclude_none=True) for log in review_logs])
+        if commit:
+            db.commit()
+        return len(review_logs)
+    
+    @staticmethod
+    def get_existing_client_ids(db: Session, user_id: int, client_review_ids: Iterable[str]) -> set:
+        """The subset of client_review_ids already stored for the user"""
+        client_review_ids = list(client_review_ids)
+        existing = set()
+        # Chunked to stay well under the bind parameter limits of the drivers
+        for i in range(0, len(client_review_ids), 1000):
+            existing.update(db.scalars(select(ReviewLogs.client_review_id).where(
+                ReviewLogs.user_id == user_id,
+                ReviewLogs.client_review_id.in_(client_review_ids[i:i + 1000])
+            )))
+        return existing
+    
+    @staticmethod
+    def get_by_user(
+        db: Session,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        before: Optional[Tuple[datetime, int]] = None
+    ) -> List[ReviewLogs]:
+        """Newest first; `before` resumes after the (reviewed_at, id) key of the previous page"""
+        query = db.query(ReviewLogs).filter(ReviewLogs.user_id == user_id)
+        if before:
+            before_reviewed_at, before_id = before
+            query = query.filter(or_(
+                ReviewLogs.reviewed_at < before_reviewed_at,
+                and_(ReviewLogs.reviewed_at == before_reviewed_at, ReviewLogs.id < before_id)
+            ))
+        elif skip:
+            query = query.offset(skip)
+        return query.order_by(ReviewLogs.reviewed_at.desc(), ReviewLogs.id.desc()).limit(limit).all()
+    
+    @staticmethod
+    def iter_by_user(db: Session, user_id: int, batch_size: int = 5000):
+        """Every log of the user, oldest first, fetched batch_size rows at a time"""
+        stmt = select(
+            ReviewLogs.id, ReviewLogs.card_id, ReviewLogs.quality, ReviewLogs.study_time_ms,
+            ReviewLogs.reviewed_at, ReviewLogs.client_review_id
+        ).where(
             ReviewLogs.user_id == user_id
-        ).order_by(ReviewLogs.reviewed_at.desc()).offset(skip).limit(limit).all()
+        ).order_by(ReviewLogs.reviewed_at, ReviewLogs.id)
+        return db.execute(stmt, execution_options={"yield_per": batch_size})
+    
+    @staticmethod
+    def stream_history(db: Session, after_user_id: Optional[int] = None, batch_size: int = 10_000):
+        """(user_id, card_id, quality, reviewed_at) rows for all users, grouped by user in review order.
+        
+        Rows are fetched batch_size at a time so the whole table is never held in memory.
+        """
+        stmt = select(
+            ReviewLogs.user_id, ReviewLogs.card_id, ReviewLogs.quality, ReviewLogs.reviewed_at
+        ).order_by(ReviewLogs.user_id, ReviewLogs.reviewed_at, ReviewLogs.id)
+        if after_user_id is not None:
+            stmt = stmt.where(ReviewLogs.user_id > after_user_id)
+        return db.execute(stmt, execution_options={"yield_per": batch_size})
 
 
 class UserStatsRepository:
@@ -86,7 +297,7 @@ class UserStatsRepository:
         return db.query(UserStats).filter(UserStats.user_id == user_id).first()
     
     @staticmethod
-    def create_or_update(db: Session, user_id: int, stats_data: Optional[UserStatsUpdate] = None) -> UserStats:
+    def create_or_update(db: Session, user_id: int, stats_data: Optional[UserStatsUpdate] = None, commit: bool = True) -> UserStats:
         existing = UserStatsRepository.get_by_user(db, user_id)
         
         if existing:
@@ -94,8 +305,7 @@ class UserStatsRepository:
                 update_dict = stats_data.model_dump(exclude_unset=True)
                 for field, value in update_dict.items():
                     setattr(existing, field, value)
-            db.commit()
-            db.refresh(existing)
+            _save(db, existing, commit)
             return existing
         else:
             db_stats = UserStats(user_id=user_id)
@@ -104,19 +314,28 @@ class UserStatsRepository:
                 for field, value in update_dict.items():
                     setattr(db_stats, field, value)
             db.add(db_stats)
-            db.commit()
-            db.refresh(db_stats)
+            _save(db, db_stats, commit)
             return db_stats
     
     @staticmethod
-    def update_streak(db: Session, user_id: int, study_date: date) -> UserStats:
+    def update_streak(db: Session, user_id: int, study_date: date, commit: bool = True) -> UserStats:
         stats = UserStatsRepository.get_by_user(db, user_id)
         if not stats:
-            stats = UserStatsRepository.create_or_update(db, user_id)
+            stats = UserStatsRepository.create_or_update(db, user_id, commit=commit)
         
+        UserStatsRepository.apply_streak(stats, study_date)
+        _save(db, stats, commit)
+        return stats
+
+
+    @staticmethod
+    def apply_streak(stats: UserStats, study_date: date) -> UserStats:
+        """Update streak fields in memory for a study session on study_date"""
         if stats.last_study_date:
-            from datetime import timedelta
             days_diff = (study_date - stats.last_study_date).days
+            if days_diff < 0:
+                # Late-arriving (offline) study before the last recorded day cannot extend the streak
+                return stats
             if days_diff == 1:
                 stats.current_streak += 1
             elif days_diff > 1:
@@ -128,8 +347,6 @@ class UserStatsRepository:
             stats.longest_streak = stats.current_streak
         
         stats.last_study_date = study_date
-        db.commit()
-        db.refresh(stats)
         return stats
 
 
@@ -139,7 +356,7 @@ class AlgoConfigsRepository:
         return db.query(AlgoConfigs).filter(AlgoConfigs.user_id == user_id).first()
     
     @staticmethod
-    def create_or_update(db: Session, user_id: int, config_data: Optional[AlgoConfigsUpdate] = None) -> AlgoConfigs:
+    def create_or_update(db: Session, user_id: int, config_data: Optional[AlgoConfigsUpdate] = None, commit: bool = True) -> AlgoConfigs:
         existing = AlgoConfigsRepository.get_by_user(db, user_id)
         
         if existing:
@@ -147,8 +364,7 @@ class AlgoConfigsRepository:
                 update_dict = config_data.model_dump(exclude_unset=True)
                 for field, value in update_dict.items():
                     setattr(existing, field, value)
-            db.commit()
-            db.refresh(existing)
+            _save(db, existing, commit)
             return existing
         else:
             db_config = AlgoConfigs(user_id=user_id)
@@ -157,7 +373,33 @@ class AlgoConfigsRepository:
                 for field, value in update_dict.items():
                     setattr(db_config, field, value)
             db.add(db_config)
-            db.commit()
-            db.refresh(db_config)
+            _save(db, db_config, commit)
             return db_config
-
+    
+    @staticmethod
+    def bulk_save(db: Session, rows: List[dict], commit: bool = True) -> int:
+        """Write config fields for many users: executemany UPDATE for existing rows, INSERT for the rest.
+        
+        Every row needs the same keys, one of them user_id.
+        """
+        if not rows:
+            return 0
+        existing = set(db.scalars(
+            select(AlgoConfigs.user_id).where(AlgoConfigs.user_id.in_([row["user_id"] for row in rows]))
+        ))
+        updates = [
+            {**{k: v for k, v in row.items() if k != "user_id"}, "key_user_id": row["user_id"]}
+            for row in rows if row["user_id"] in existing
+        ]
+        inserts = [row for row in rows if row["user_id"] not in existing]
+        if updates:
+            table = AlgoConfigs.__table__
+            columns = [k for k in rows[0] if k != "user_id"]
+            stmt = update(table).where(
+                table.c.user_id == bindparam("key_user_id")
+            ).values({column: bindparam(column) for column in columns})
+            db.connection().execute(stmt, updates)
+        if inserts:
+            db.execute(insert(AlgoConfigs), inserts)
+        _save(db, commit=commit)
+        return len(rows)
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List, Literal
 from datetime import datetime, date
+from uuid import UUID
 from app.models.learning import CardStatus
 
 
@@ -12,6 +13,8 @@ class CardRetentionDataBase(BaseModel):
     ease_factor: float = 2.5
     repetition_count: int = 0
     status: CardStatus = CardStatus.NEW
+    stability: Optional[float] = None
+    difficulty: Optional[float] = None
 
 
 class CardRetentionDataCreate(CardRetentionDataBase):
@@ -26,6 +29,8 @@ class CardRetentionDataUpdate(BaseModel):
     ease_factor: Optional[float] = None
     repetition_count: Optional[int] = None
     status: Optional[CardStatus] = None
+    stability: Optional[float] = None
+    difficulty: Optional[float] = None
 
 
 class CardRetentionDataResponse(CardRetentionDataBase):
@@ -42,6 +47,8 @@ class ReviewLogCreate(BaseModel):
     card_id: int
     quality: int = Field(..., ge=0, le=5)
     study_time_ms: int = Field(..., ge=0)
+    reviewed_at: Optional[datetime] = None
+    client_review_id: Optional[str] = None
 
 
 class ReviewLogResponse(BaseModel):
@@ -51,11 +58,62 @@ class ReviewLogResponse(BaseModel):
     quality: int
     study_time_ms: int
     reviewed_at: datetime
+    client_review_id: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 
+# Batch Review Schemas
+class ReviewItem(BaseModel):
+    card_id: int
+    quality: int = Field(..., ge=0, le=5)
+    study_time_ms: int = Field(..., ge=0)
+
+
+class BatchReviewRequest(BaseModel):
+    reviews: List[ReviewItem] = Field(..., min_length=1, max_length=200)
+
+
+class BatchReviewItemResult(BaseModel):
+    card_id: int
+    success: bool
+    error: Optional[str] = None
+    next_review: Optional[datetime] = None
+    interval_days: Optional[int] = None
+    ease_factor: Optional[float] = None
+    repetition_count: Optional[int] = None
+    status: Optional[CardStatus] = None
+
+
+class BatchReviewResponse(BaseModel):
+    results: List[BatchReviewItemResult]
+    reviewed: int
+    failed: int
+
+
+# Offline Sync Schemas
+class SyncReviewItem(ReviewItem):
+    client_review_id: UUID
+    reviewed_at: datetime
+
+
+class SyncRequest(BaseModel):
+    reviews: List[SyncReviewItem] = Field(..., min_length=1, max_length=2000)
+
+
+class SyncReviewError(BaseModel):
+    client_review_id: UUID
+    error: str
+
+
+class SyncResponse(BaseModel):
+    accepted: int
+    duplicates: int
+    failed: List[SyncReviewError]
+    changed: List[CardRetentionDataResponse]
+
+
 # User Stats Schemas
 class UserStatsBase(BaseModel):
     total_xp: int = 0
@@ -90,6 +148,8 @@ class AlgoConfigsBase(BaseModel):
     interval_modifier: float = 1.0
     easy_bonus: float = 1.3
     hard_interval: float = 1.2
+    scheduler: Literal["sm2", "fsrs"] = "sm2"
+    desired_retention: float = Field(0.9, ge=0.7, le=0.99)
 
 
 class AlgoConfigsCreate(AlgoConfigsBase):
@@ -101,6 +161,8 @@ class AlgoConfigsUpdate(BaseModel):
     interval_modifier: Optional[float] = None
     easy_bonus: Optional[float] = None
     hard_interval: Optional[float] = None
+    scheduler: Optional[Literal["sm2", "fsrs"]] = None
+    desired_retention: Optional[float] = Field(None, ge=0.7, le=0.99)
 
 
 class AlgoConfigsResponse(AlgoConfigsBase):
@@ -110,6 +172,39 @@ class AlgoConfigsResponse(AlgoConfigsBase):
         from_attributes = True
 
 
+# Study Session Schemas
+class StudySessionCard(BaseModel):
+    card_id: int
+    deck_id: int
+    front_content: str
+    back_content: str
+    image_url: Optional[str] = None
+    is_new: bool
+    status: CardStatus = CardStatus.NEW
+    next_review: Optional[datetime] = None
+    interval_days: int = 0
+    ease_factor: Optional[float] = None
+    repetition_count: int = 0
+
+
+class StudySessionResponse(BaseModel):
+    cards: List[StudySessionCard]
+    due_count: int
+    new_count: int
+
+
+# Forecast Schemas
+class ForecastDay(BaseModel):
+    date: date
+    due: int
+
+
+class ForecastResponse(BaseModel):
+    overdue: int
+    days: List[ForecastDay]
+    total: int
+
+
 # Study Progress Response
 class StudyProgressResponse(BaseModel):
     user_stats: UserStatsResponse
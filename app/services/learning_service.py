@@ -1,5 +1,11 @@
+import csv
+import io
+import json
+import numpy as np
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple
 from fastapi import HTTPException, status
 from app.repositories.learning_repository import (
     CardRetentionDataRepository, ReviewLogsRepository,
@@ -8,14 +14,29 @@ from app.repositories.learning_repository import (
 from app.repositories.deck_repository import FlashcardRepository
 from app.schemas.learning import (
     ReviewLogCreate, CardRetentionDataUpdate,
-    UserStatsUpdate, AlgoConfigsUpdate, StudyProgressResponse
+    UserStatsUpdate, AlgoConfigsUpdate, StudyProgressResponse,
+    ReviewItem, BatchReviewItemResult, BatchReviewResponse,
+    ForecastDay, ForecastResponse, StudySessionCard, StudySessionResponse,
+    SyncReviewItem, SyncReviewError, SyncResponse, CardRetentionDataResponse
 )
-from app.models.learning import CardStatus
+from app.models.learning import CardStatus, CardRetentionData, AlgoConfigs
+from app.core.pagination import encode_cursor, decode_cursor
+from app.services.scheduler_service import CardState, SM2Scheduler, get_scheduler
+from app.services.review_log_buffer import get_review_log_buffer
 from app.schemas.learning import CardRetentionDataCreate
 from app.repositories.learning_repository import AlgoConfigsRepository
 
 
 class LearningService:
+    @staticmethod
+    def algo_config_dict(algo_config: AlgoConfigs) -> dict:
+        return {
+            "interval_modifier": algo_config.interval_modifier,
+            "easy_bonus": algo_config.easy_bonus,
+            "hard_interval": algo_config.hard_interval,
+            "desired_retention": algo_config.desired_retention
+        }
+    
     @staticmethod
     def calculate_next_review(
         quality: int,
@@ -25,38 +46,92 @@ class LearningService:
         algo_config: dict
     ) -> tuple:
         """Calculate next review time using SM-2 algorithm"""
-        if quality < 3:  # Failed
-            new_status = CardStatus.RELEARNING
-            new_interval = 1
-            new_ease = max(1.3, current_ease - 0.2)
-            new_repetition = 0
-        else:  # Passed
-            if repetition_count == 0:
-                new_interval = 1
-            elif repetition_count == 1:
-                new_interval = 6
-            else:
-                new_interval = int(current_interval * current_ease * algo_config.get("interval_modifier", 1.0))
-            
-            if quality == 5:  # Easy
-                new_interval = int(new_interval * algo_config.get("easy_bonus", 1.3))
-            
-            if quality == 1:  # Hard
-                new_interval = max(1, int(new_interval * algo_config.get("hard_interval", 1.2)))
-            
-            new_ease = current_ease + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
-            new_ease = max(1.3, new_ease)
-            
-            if repetition_count == 0:
-                new_status = CardStatus.LEARNING
-            else:
-                new_status = CardStatus.REVIEW
-            
-            new_repetition = repetition_count + 1
-        
+        new_interval, new_ease, new_repetition, new_status = SM2Scheduler.compute(
+            quality, current_ease, current_interval, repetition_count, algo_config
+        )
         next_review = datetime.utcnow() + timedelta(days=new_interval)
         return next_review, new_interval, new_ease, new_repetition, new_status
     
+    @staticmethod
+    def calculate_next_review_batch(
+        quality: np.ndarray,
+        current_ease: np.ndarray,
+        current_interval: np.ndarray,
+        repetition_count: np.ndarray,
+        algo_config: dict
+    ) -> tuple:
+        """Vectorized calculate_next_review over NumPy arrays (no next_review timestamps)"""
+        quality = np.asarray(quality, dtype=np.int64)
+        ease = np.asarray(current_ease, dtype=np.float64)
+        interval = np.asarray(current_interval, dtype=np.float64)
+        repetitions = np.asarray(repetition_count, dtype=np.int64)
+        passed = quality >= 3
+        
+        passed_interval = np.where(
+            repetitions == 0, 1.0,
+            np.where(repetitions == 1, 6.0, np.trunc(interval * ease * algo_config.get("interval_modifier", 1.0)))
+        )
+        passed_interval = np.where(
+            quality == 5, np.trunc(passed_interval * algo_config.get("easy_bonus", 1.3)), passed_interval
+        )
+        new_interval = np.where(passed, passed_interval, 1.0).astype(np.int64)
+        
+        quality_gap = 5 - quality
+        passed_ease = np.maximum(1.3, ease + (0.1 - quality_gap * (0.08 + quality_gap * 0.02)))
+        new_ease = np.where(passed, passed_ease, np.maximum(1.3, ease - 0.2))
+        new_repetition = np.where(passed, repetitions + 1, 0)
+        
+        new_status = np.empty(quality.shape, dtype=object)
+        new_status[:] = CardStatus.RELEARNING
+        new_status[passed & (repetitions == 0)] = CardStatus.LEARNING
+        new_status[passed & (repetitions != 0)] = CardStatus.REVIEW
+        return new_interval, new_ease, new_repetition, new_status
+    
+    @staticmethod
+    def reschedule_cards(db: Session, user_id: int, old_config: dict, new_config: dict) -> int:
+        """Replay the last review of every passed card under new_config and bulk-update its schedule.
+        
+        Only flushes; the caller commits. Returns the number of cards whose interval changed.
+        """
+        easy_bonus_changed = old_config["easy_bonus"] != new_config["easy_bonus"]
+        if old_config["interval_modifier"] == new_config["interval_modifier"] and not easy_bonus_changed:
+            return 0
+        
+        rows = CardRetentionDataRepository.get_schedule_columns(db, user_id, with_last_quality=easy_bonus_changed)
+        if not rows:
+            return 0
+        
+        columns = list(zip(*rows))
+        count = len(rows)
+        card_ids = np.fromiter(columns[0], dtype=np.int64, count=count)
+        interval = np.fromiter(columns[1], dtype=np.float64, count=count)
+        repetitions = np.fromiter(columns[2], dtype=np.int64, count=count)
+        last_review = np.array(columns[3], dtype="datetime64[us]")
+        if easy_bonus_changed:
+            # Only "easy" (5) matters for the interval; a missing log counts as a plain pass
+            quality = np.fromiter((5 if q == 5 else 4 for q in columns[4]), dtype=np.int64, count=count)
+        else:
+            quality = np.full(count, 4, dtype=np.int64)
+        
+        # Undo the old modifier and easy bonus to get interval * ease before the last review;
+        # the epsilon keeps an unchanged factor from truncating e.g. 9.9999999 down to 9
+        old_bonus = np.where(quality == 5, old_config["easy_bonus"], 1.0)
+        base = interval / (old_config["interval_modifier"] * old_bonus) * (1 + 1e-9)
+        new_interval, _, _, _ = LearningService.calculate_next_review_batch(
+            quality, np.ones(count), base, repetitions - 1, new_config
+        )
+        new_interval = np.maximum(new_interval, 1)
+        
+        changed = new_interval != interval
+        next_review = last_review[changed] + new_interval[changed].astype("timedelta64[D]")
+        updates = [
+            {"key_user_id": user_id, "key_card_id": card_id, "interval_days": days, "next_review": review_at}
+            for card_id, days, review_at in zip(
+                card_ids[changed].tolist(), new_interval[changed].tolist(), next_review.tolist()
+            )
+        ]
+        return CardRetentionDataRepository.bulk_update_schedule(db, updates, commit=False)
+    
     @staticmethod
     def review_card(
         db: Session,
@@ -65,82 +140,394 @@ class LearningService:
         quality: int,
         study_time_ms: int
     ) -> dict:
-        # Get or create retention data
-        retention = CardRetentionDataRepository.get_by_user_and_card(db, user_id, card_id)
-        if not retention:
+        # One unit of work: repositories only flush, a single commit at the end
+        try:
             algo_config = AlgoConfigsRepository.get_by_user(db, user_id)
             if not algo_config:
-                algo_config = AlgoConfigsRepository.create_or_update(db, user_id)
+                algo_config = AlgoConfigsRepository.create_or_update(db, user_id, commit=False)
+            
+            # Get or create retention data
+            retention = CardRetentionDataRepository.get_by_user_and_card(db, user_id, card_id)
+            if not retention:
+                retention_data = CardRetentionDataCreate(
+                    user_id=user_id,
+                    card_id=card_id,
+                    ease_factor=algo_config.starting_ease,
+                    status=CardStatus.NEW
+                )
+                retention = CardRetentionDataRepository.create(db, retention_data, commit=False)
+            previous_status = retention.status
+            
+            # Calculate next review with the user's scheduler
+            scheduler = get_scheduler(algo_config.scheduler)
+            state = scheduler.review(
+                CardState.from_retention(retention),
+                quality,
+                datetime.utcnow(),
+                LearningService.algo_config_dict(algo_config)
+            )
+            state.apply_to(retention)
+            
+            # Create review log; with the write-behind buffer it is queued after the commit instead
+            review_log = ReviewLogCreate(
+                user_id=user_id,
+                card_id=card_id,
+                quality=quality,
+                study_time_ms=study_time_ms,
+                reviewed_at=state.last_review
+            )
+            buffer = get_review_log_buffer()
+            if not buffer:
+                ReviewLogsRepository.create(db, review_log, commit=False)
+            
+            # Update user stats
+            today = date.today()
+            stats = UserStatsRepository.update_streak(db, user_id, today, commit=False)
             
-            retention_data = CardRetentionDataCreate(
+            if state.status == CardStatus.REVIEW and previous_status != CardStatus.REVIEW:
+                stats.cards_learned += 1
+                stats.total_xp += 10
+            
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        if buffer:
+            buffer.add(review_log)
+        
+        return {
+            "next_review": state.next_review,
+            "interval_days": state.interval_days,
+            "ease_factor": state.ease_factor,
+            "repetition_count": state.repetition_count,
+            "status": state.status
+        }
+    
+    @staticmethod
+    def _get_or_add_retention(
+        db: Session,
+        retentions: dict,
+        user_id: int,
+        card_id: int,
+        algo_config: AlgoConfigs
+    ) -> CardRetentionData:
+        """Retention row from the preloaded map, or a new pending one added to the session"""
+        retention = retentions.get(card_id)
+        if not retention:
+            retention = CardRetentionData(
                 user_id=user_id,
                 card_id=card_id,
+                interval_days=0,
                 ease_factor=algo_config.starting_ease,
+                repetition_count=0,
                 status=CardStatus.NEW
             )
-            retention = CardRetentionDataRepository.create_or_update(db, retention_data)
+            db.add(retention)
+            retentions[card_id] = retention
+        return retention
+    
+    @staticmethod
+    def review_cards_batch(db: Session, user_id: int, reviews: List[ReviewItem]) -> BatchReviewResponse:
+        """Apply a queue of reviews in a single transaction"""
+        card_ids = {item.card_id for item in reviews}
+        card_decks = FlashcardRepository.get_deck_ids(db, card_ids)
+        retentions = {
+            r.card_id: r
+            for r in CardRetentionDataRepository.get_by_user_and_cards(db, user_id, card_decks.keys())
+        }
         
-        # Get algorithm config
         algo_config = AlgoConfigsRepository.get_by_user(db, user_id)
         if not algo_config:
-            algo_config = AlgoConfigsRepository.create_or_update(db, user_id)
+            algo_config = AlgoConfigsRepository.create_or_update(db, user_id, commit=False)
+        algo_dict = LearningService.algo_config_dict(algo_config)
+        scheduler = get_scheduler(algo_config.scheduler)
         
-        algo_dict = {
-            "interval_modifier": algo_config.interval_modifier,
-            "easy_bonus": algo_config.easy_bonus,
-            "hard_interval": algo_config.hard_interval
-        }
+        stats = UserStatsRepository.get_by_user(db, user_id)
+        if not stats:
+            stats = UserStatsRepository.create_or_update(db, user_id, commit=False)
         
-        # Calculate next review
-        next_review, new_interval, new_ease, new_repetition, new_status = LearningService.calculate_next_review(
-            quality,
-            retention.ease_factor,
-            retention.interval_days,
-            retention.repetition_count,
-            algo_dict
-        )
+        results = []
+        review_logs = []
+        cards_learned = 0
+        try:
+            for item in reviews:
+                if item.card_id not in card_decks:
+                    results.append(BatchReviewItemResult(
+                        card_id=item.card_id, success=False, error="Flashcard not found"
+                    ))
+                    continue
+                
+                retention = LearningService._get_or_add_retention(db, retentions, user_id, item.card_id, algo_config)
+                previous_status = retention.status
+                state = scheduler.review(CardState.from_retention(retention), item.quality, datetime.utcnow(), algo_dict)
+                state.apply_to(retention)
+                
+                if state.status == CardStatus.REVIEW and previous_status != CardStatus.REVIEW:
+                    cards_learned += 1
+                
+                review_logs.append(ReviewLogCreate(
+                    user_id=user_id,
+                    card_id=item.card_id,
+                    quality=item.quality,
+                    study_time_ms=item.study_time_ms,
+                    reviewed_at=state.last_review
+                ))
+                results.append(BatchReviewItemResult(
+                    card_id=item.card_id,
+                    success=True,
+                    next_review=state.next_review,
+                    interval_days=state.interval_days,
+                    ease_factor=state.ease_factor,
+                    repetition_count=state.repetition_count,
+                    status=state.status
+                ))
+            
+            if review_logs:
+                ReviewLogsRepository.bulk_create(db, review_logs, commit=False)
+                UserStatsRepository.apply_streak(stats, date.today())
+                stats.cards_learned += cards_learned
+                stats.total_xp += cards_learned * 10
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
         
-        # Update retention data
-        update_data = CardRetentionDataUpdate(
-            next_review=next_review,
-            last_review=datetime.utcnow(),
-            interval_days=new_interval,
-            ease_factor=new_ease,
-            repetition_count=new_repetition,
-            status=new_status
+        return BatchReviewResponse(
+            results=results,
+            reviewed=len(review_logs),
+            failed=len(results) - len(review_logs)
         )
-        CardRetentionDataRepository.update(db, user_id, card_id, update_data)
-        
-        # Create review log
-        review_log = ReviewLogCreate(
-            user_id=user_id,
-            card_id=card_id,
-            quality=quality,
-            study_time_ms=study_time_ms
-        )
-        ReviewLogsRepository.create(db, review_log)
+    
+    @staticmethod
+    def sync_reviews(db: Session, user_id: int, reviews: List[SyncReviewItem]) -> SyncResponse:
+        """Apply reviews recorded offline, exactly once per client_review_id.
+        
+        Reviews already stored (or repeated within the request) are skipped. The rest are replayed
+        per card in client timestamp order on top of the server state, in one transaction.
+        """
+        try:
+            return LearningService._sync_reviews(db, user_id, reviews)
+        except IntegrityError:
+            # A concurrent sync stored some of the same reviews first; they are duplicates now
+            db.rollback()
+            return LearningService._sync_reviews(db, user_id, reviews)
+    
+    @staticmethod
+    def _sync_reviews(db: Session, user_id: int, reviews: List[SyncReviewItem]) -> SyncResponse:
+        now = datetime.utcnow()
+        unique = {}
+        for item in reviews:
+            unique.setdefault(str(item.client_review_id), item)
+        stored = ReviewLogsRepository.get_existing_client_ids(db, user_id, unique.keys())
+        pending = [item for client_id, item in unique.items() if client_id not in stored]
         
-        # Update user stats
-        today = date.today()
-        stats = UserStatsRepository.update_streak(db, user_id, today)
+        card_decks = FlashcardRepository.get_deck_ids(db, {item.card_id for item in pending})
+        failed = [
+            SyncReviewError(client_review_id=item.client_review_id, error="Flashcard not found")
+            for item in pending if item.card_id not in card_decks
+        ]
         
-        if new_status == CardStatus.REVIEW and retention.status != CardStatus.REVIEW:
-            stats.cards_learned += 1
-            stats.total_xp += 10
+        def client_time(item: SyncReviewItem) -> datetime:
+            # Naive UTC like the rest of the schedule; clocks running ahead are clamped to now
+            reviewed_at = item.reviewed_at
+            if reviewed_at.tzinfo is not None:
+                reviewed_at = reviewed_at.astimezone(timezone.utc).replace(tzinfo=None)
+            return min(reviewed_at, now)
+        
+        accepted = sorted(
+            ((item.card_id, client_time(item), str(item.client_review_id), item)
+             for item in pending if item.card_id in card_decks),
+            key=lambda entry: entry[:3]
+        )
+        if not accepted:
+            return SyncResponse(
+                accepted=0, duplicates=len(reviews) - len(pending), failed=failed, changed=[]
+            )
+        
+        try:
+            retentions = {
+                r.card_id: r
+                for r in CardRetentionDataRepository.get_by_user_and_cards(db, user_id, card_decks.keys())
+            }
+            algo_config = AlgoConfigsRepository.get_by_user(db, user_id)
+            if not algo_config:
+                algo_config = AlgoConfigsRepository.create_or_update(db, user_id, commit=False)
+            algo_dict = LearningService.algo_config_dict(algo_config)
+            scheduler = get_scheduler(algo_config.scheduler)
+            stats = UserStatsRepository.get_by_user(db, user_id)
+            if not stats:
+                stats = UserStatsRepository.create_or_update(db, user_id, commit=False)
+            
+            review_logs = []
+            changed = {}
+            cards_learned = 0
+            for card_id, reviewed_at, client_id, item in accepted:
+                retention = LearningService._get_or_add_retention(db, retentions, user_id, card_id, algo_config)
+                previous_status = retention.status
+                state = scheduler.review(CardState.from_retention(retention), item.quality, reviewed_at, algo_dict)
+                state.apply_to(retention)
+                if retention.status == CardStatus.REVIEW and previous_status != CardStatus.REVIEW:
+                    cards_learned += 1
+                changed[card_id] = retention
+                review_logs.append(ReviewLogCreate(
+                    user_id=user_id,
+                    card_id=card_id,
+                    quality=item.quality,
+                    study_time_ms=item.study_time_ms,
+                    reviewed_at=reviewed_at,
+                    client_review_id=client_id
+                ))
+            
+            ReviewLogsRepository.bulk_create(db, review_logs, commit=False)
+            for study_date in sorted({reviewed_at.date() for _, reviewed_at, _, _ in accepted}):
+                UserStatsRepository.apply_streak(stats, study_date)
+            stats.cards_learned += cards_learned
+            stats.total_xp += cards_learned * 10
             db.commit()
+        except Exception:
+            db.rollback()
+            raise
         
-        return {
-            "next_review": next_review,
-            "interval_days": new_interval,
-            "ease_factor": new_ease,
-            "repetition_count": new_repetition,
-            "status": new_status
-        }
+        return SyncResponse(
+            accepted=len(review_logs),
+            duplicates=len(reviews) - len(pending),
+            failed=failed,
+            changed=[CardRetentionDataResponse.model_validate(r) for r in changed.values()]
+        )
     
     @staticmethod
     def get_due_cards(db: Session, user_id: int) -> list:
         return CardRetentionDataRepository.get_due_cards(db, user_id)
     
+    @staticmethod
+    def get_due_cards_page(
+        db: Session,
+        user_id: int,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[list, Optional[str]]:
+        """One keyset page of due cards plus the cursor for the next page"""
+        after = None
+        if cursor:
+            try:
+                next_review, card_id = decode_cursor(cursor, 2)
+                after = (datetime.fromisoformat(next_review), int(card_id))
+            except (ValueError, TypeError):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor"
+                )
+        
+        cards = CardRetentionDataRepository.get_due_cards(db, user_id, limit + 1, after)
+        next_cursor = None
+        if len(cards) > limit:
+            cards = cards[:limit]
+            next_cursor = encode_cursor(cards[-1].next_review, cards[-1].card_id)
+        return cards, next_cursor
+    
+    @staticmethod
+    def get_review_logs_page(
+        db: Session,
+        user_id: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        skip: int = 0
+    ) -> Tuple[list, Optional[str]]:
+        """One page of review history, newest first, plus the cursor for the next page"""
+        before = None
+        if cursor:
+            try:
+                reviewed_at, log_id = decode_cursor(cursor, 2)
+                before = (datetime.fromisoformat(reviewed_at), int(log_id))
+            except (ValueError, TypeError):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor"
+                )
+        
+        logs = ReviewLogsRepository.get_by_user(db, user_id, skip, limit + 1, before)
+        next_cursor = None
+        if len(logs) > limit:
+            logs = logs[:limit]
+            next_cursor = encode_cursor(logs[-1].reviewed_at, logs[-1].id)
+        return logs, next_cursor
+    
+    EXPORT_COLUMNS = ("id", "card_id", "quality", "study_time_ms", "reviewed_at", "client_review_id")
+    
+    @staticmethod
+    def export_review_logs(db: Session, user_id: int, export_format: str) -> Iterator[str]:
+        """The user's full review history as NDJSON or CSV, produced one fetched batch at a time.
+        
+        Runs on its own session so the export does not depend on the request session's lifetime.
+        """
+        export_db = Session(bind=db.get_bind())
+        try:
+            result = ReviewLogsRepository.iter_by_user(export_db, user_id)
+            columns = LearningService.EXPORT_COLUMNS
+            if export_format == "csv":
+                yield ",".join(columns) + "\r\n"
+            for rows in result.partitions():
+                out = io.StringIO()
+                if export_format == "csv":
+                    writer = csv.writer(out)
+                    writer.writerows(
+                        [*row[:4], row[4].isoformat() if row[4] else "", row[5] or ""] for row in rows
+                    )
+                else:
+                    for row in rows:
+                        out.write(json.dumps(dict(zip(columns, row)), default=datetime.isoformat))
+                        out.write("\n")
+                yield out.getvalue()
+        finally:
+            export_db.close()
+    
+    @staticmethod
+    def get_study_session(
+        db: Session,
+        user_id: int,
+        limit: int,
+        new_cards: int,
+        deck_id: Optional[int] = None
+    ) -> StudySessionResponse:
+        """Up to `limit` due cards plus up to `new_cards` unseen ones, with their content, in two queries"""
+        due = [
+            StudySessionCard(
+                card_id=flashcard.id,
+                deck_id=flashcard.deck_id,
+                front_content=flashcard.front_content,
+                back_content=flashcard.back_content,
+                image_url=flashcard.image_url,
+                is_new=False,
+                status=retention.status,
+                next_review=retention.next_review,
+                interval_days=retention.interval_days,
+                ease_factor=retention.ease_factor,
+                repetition_count=retention.repetition_count
+            )
+            for retention, flashcard in CardRetentionDataRepository.get_due_with_cards(db, user_id, limit, deck_id)
+        ]
+        new = []
+        if new_cards:
+            new = [
+                StudySessionCard(
+                    card_id=flashcard.id,
+                    deck_id=flashcard.deck_id,
+                    front_content=flashcard.front_content,
+                    back_content=flashcard.back_content,
+                    image_url=flashcard.image_url,
+                    is_new=True
+                )
+                for flashcard in FlashcardRepository.get_new_for_user(db, user_id, new_cards, deck_id)
+            ]
+        
+        # Spread the new cards evenly through the reviews instead of leaving them all for the end
+        cards = list(due)
+        step = len(due) // len(new) + 1 if new else 0
+        for i, card in enumerate(new):
+            cards.insert(min(i * (step + 1) + step - 1, len(cards)), card)
+        return StudySessionResponse(cards=cards, due_count=len(due), new_count=len(new))
+    
     @staticmethod
     def get_study_progress(db: Session, user_id: int) -> StudyProgressResponse:
         stats = UserStatsRepository.get_by_user(db, user_id)
@@ -152,10 +539,11 @@ class LearningService:
             algo_configs = AlgoConfigsRepository.create_or_update(db, user_id)
         
         # Count cards
-        all_retention = CardRetentionDataRepository.get_by_user(db, user_id)
-        cards_due_today = len([r for r in all_retention if r.next_review and r.next_review <= datetime.utcnow()])
-        cards_in_learning = len([r for r in all_retention if r.status == CardStatus.LEARNING])
-        cards_mastered = len([r for r in all_retention if r.status == CardStatus.REVIEW])
+        status_counts, cards_due_today = CardRetentionDataRepository.get_status_counts(
+            db, user_id, datetime.utcnow()
+        )
+        cards_in_learning = status_counts.get(CardStatus.LEARNING, 0)
+        cards_mastered = status_counts.get(CardStatus.REVIEW, 0)
         
         from app.schemas.learning import UserStatsResponse, AlgoConfigsResponse
         return StudyProgressResponse(
@@ -166,7 +554,59 @@ class LearningService:
             cards_mastered=cards_mastered
         )
     
+    @staticmethod
+    def get_forecast(
+        db: Session,
+        days: int,
+        user_id: Optional[int] = None,
+        class_id: Optional[int] = None
+    ) -> ForecastResponse:
+        """Cards due on each of the next `days` days (UTC), today first; earlier days count as overdue"""
+        today = datetime.utcnow().date()
+        end = datetime.combine(today + timedelta(days=days), datetime.min.time())
+        histogram = CardRetentionDataRepository.get_due_histogram(db, end, user_id=user_id, class_id=class_id)
+        
+        counts = dict(histogram)
+        overdue = sum(count for day, count in histogram if day < today)
+        forecast = [
+            ForecastDay(date=today + timedelta(days=offset), due=counts.get(today + timedelta(days=offset), 0))
+            for offset in range(days)
+        ]
+        return ForecastResponse(
+            overdue=overdue,
+            days=forecast,
+            total=overdue + sum(day.due for day in forecast)
+        )
+    
     @staticmethod
     def update_algo_config(db: Session, user_id: int, config_update: AlgoConfigsUpdate) -> dict:
         return AlgoConfigsRepository.create_or_update(db, user_id, config_update)
+    
+    @staticmethod
+    def update_algo_config_and_reschedule(
+        db: Session,
+        user_id: int,
+        config_update: AlgoConfigsUpdate
+    ) -> Tuple[AlgoConfigs, int]:
+        """Update the config and move existing cards onto it in the same transaction"""
+        try:
+            algo_config = AlgoConfigsRepository.get_by_user(db, user_id)
+            if not algo_config:
+                algo_config = AlgoConfigsRepository.create_or_update(db, user_id, commit=False)
+            old_config = LearningService.algo_config_dict(algo_config)
+            old_scheduler = algo_config.scheduler
+            algo_config = AlgoConfigsRepository.create_or_update(db, user_id, config_update, commit=False)
+            new_config = LearningService.algo_config_dict(algo_config)
+            # Only SM-2 intervals can be replayed from the stored columns; FSRS (or a switch between
+            # schedulers) takes effect at each card's next review
+            rescheduled = 0
+            if old_scheduler == algo_config.scheduler == SM2Scheduler.name:
+                rescheduled = LearningService.reschedule_cards(db, user_id, old_config, new_config)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        
+        db.refresh(algo_config)
+        return algo_config, rescheduled
 
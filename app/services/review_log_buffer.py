@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional
+from sqlalchemy.orm import Session
+from app.repositories.learning_repository import ReviewLogsRepository
+from app.schemas.learning import ReviewLogCreate
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewLogBuffer:
+    """Write-behind buffer that stores ReviewLogs with multi-row INSERTs.
+
+    A background thread flushes once max_rows logs are queued or the oldest one has
+    waited max_delay_ms. At most max_pending logs wait in memory besides the batch being
+    written, which bounds what a crash can lose; when the queue is full, add() flushes in
+    the caller's thread.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_rows: int = 500,
+        max_delay_ms: int = 200,
+        max_pending: int = 5000
+    ):
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.max_delay = max_delay_ms / 1000
+        self.max_pending = max(max_pending, max_rows)
+        self._pending: List[ReviewLogCreate] = []
+        self._oldest: Optional[float] = None
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        # Metrics
+        self._latencies = deque(maxlen=1000)
+        self.flushes = 0
+        self.rows_written = 0
+        self.failed_flushes = 0
+        self._last_flush_failed = False
+
+    def start(self) -> None:
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="review-log-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flusher and write everything still queued"""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def add(self, review_log: ReviewLogCreate) -> None:
+        with self._condition:
+            self._pending.append(review_log)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._pending) >= self.max_pending
+            if len(self._pending) >= self.max_rows:
+                self._condition.notify()
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all queued logs now; returns the number of rows written"""
+        with self._flush_lock:
+            with self._condition:
+                batch, self._pending, self._oldest = self._pending, [], None
+            if not batch:
+                return 0
+
+            started = time.perf_counter()
+            db = self.session_factory()
+            try:
+                ReviewLogsRepository.bulk_create(db, batch)
+            except Exception:
+                db.rollback()
+                self.failed_flushes += 1
+                self._last_flush_failed = True
+                logger.exception("Flushing %d review logs failed", len(batch))
+                with self._condition:
+                    # Keep the batch for the next attempt, but never grow past max_pending
+                    self._pending[:0] = batch[:max(self.max_pending - len(self._pending), 0)]
+                    if self._pending and self._oldest is None:
+                        self._oldest = time.monotonic()
+                return 0
+            finally:
+                db.close()
+
+            self._last_flush_failed = False
+            self._latencies.append(time.perf_counter() - started)
+            self.flushes += 1
+            self.rows_written += len(batch)
+            return len(batch)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._stopping and len(self._pending) < self.max_rows:
+                    if self._oldest is None:
+                        self._condition.wait()
+                    else:
+                        remaining = self._oldest + self.max_delay - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                if self._stopping:
+                    return
+            self.flush()
+            if self._last_flush_failed:
+                # Back off instead of hammering a database that just refused the batch
+                time.sleep(self.max_delay)
+
+    def metrics(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000, 3)
+
+        return {
+            "pending": len(self._pending),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failed_flushes": self.failed_flushes,
+            "flush_latency_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": percentile(1.0),
+            },
+        }
+
+
+_buffer: Optional[ReviewLogBuffer] = None
+
+
+def get_review_log_buffer() -> Optional[ReviewLogBuffer]:
+    return _buffer
+
+
+def start_review_log_buffer(session_factory: Callable[[], Session], **options) -> ReviewLogBuffer:
+    global _buffer
+    _buffer = ReviewLogBuffer(session_factory, **options)
+    _buffer.start()
+    return _buffer
+
+
+def stop_review_log_buffer() -> None:
+    global _buffer
+    if _buffer:
+        _buffer.stop()
+        _buffer = None
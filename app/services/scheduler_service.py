@@ -0,0 +1,205 @@
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from fastapi import HTTPException, status
+from app.models.learning import CardStatus
+
+
+@dataclass(slots=True)
+class CardState:
+    """Scheduling state of one card, kept small so replays can hold millions of them"""
+    interval_days: int = 0
+    ease_factor: float = 2.5
+    repetition_count: int = 0
+    status: CardStatus = CardStatus.NEW
+    stability: Optional[float] = None
+    difficulty: Optional[float] = None
+    last_review: Optional[datetime] = None
+    next_review: Optional[datetime] = None
+
+    @classmethod
+    def from_retention(cls, retention) -> "CardState":
+        return cls(
+            interval_days=retention.interval_days,
+            ease_factor=retention.ease_factor,
+            repetition_count=retention.repetition_count,
+            status=retention.status,
+            stability=retention.stability,
+            difficulty=retention.difficulty,
+            last_review=retention.last_review,
+            next_review=retention.next_review
+        )
+
+    def apply_to(self, retention) -> None:
+        retention.interval_days = self.interval_days
+        retention.ease_factor = self.ease_factor
+        retention.repetition_count = self.repetition_count
+        retention.status = self.status
+        retention.stability = self.stability
+        retention.difficulty = self.difficulty
+        retention.last_review = self.last_review
+        retention.next_review = self.next_review
+
+
+class Scheduler(ABC):
+    name: str
+
+    @abstractmethod
+    def review(self, state: CardState, quality: int, now: datetime, config: dict) -> CardState:
+        """Return the card state after a review of the given quality (0-5) at `now`"""
+
+
+class SM2Scheduler(Scheduler):
+    name = "sm2"
+
+    @staticmethod
+    def compute(
+        quality: int,
+        current_ease: float,
+        current_interval: int,
+        repetition_count: int,
+        algo_config: dict
+    ) -> tuple:
+        """SM-2 step without timestamps: (interval, ease, repetition_count, status)"""
+        if quality < 3:  # Failed
+            new_status = CardStatus.RELEARNING
+            new_interval = 1
+            new_ease = max(1.3, current_ease - 0.2)
+            new_repetition = 0
+        else:  # Passed
+            if repetition_count == 0:
+                new_interval = 1
+            elif repetition_count == 1:
+                new_interval = 6
+            else:
+                new_interval = int(current_interval * current_ease * algo_config.get("interval_modifier", 1.0))
+
+            if quality == 5:  # Easy
+                new_interval = int(new_interval * algo_config.get("easy_bonus", 1.3))
+
+            if quality == 1:  # Hard
+                new_interval = max(1, int(new_interval * algo_config.get("hard_interval", 1.2)))
+
+            new_ease = current_ease + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+            new_ease = max(1.3, new_ease)
+
+            if repetition_count == 0:
+                new_status = CardStatus.LEARNING
+            else:
+                new_status = CardStatus.REVIEW
+
+            new_repetition = repetition_count + 1
+
+        return new_interval, new_ease, new_repetition, new_status
+
+    def review(self, state: CardState, quality: int, now: datetime, config: dict) -> CardState:
+        new_interval, new_ease, new_repetition, new_status = SM2Scheduler.compute(
+            quality, state.ease_factor, state.interval_days, state.repetition_count, config
+        )
+        return replace(
+            state,
+            interval_days=new_interval,
+            ease_factor=new_ease,
+            repetition_count=new_repetition,
+            status=new_status,
+            last_review=now,
+            next_review=now + timedelta(days=new_interval)
+        )
+
+
+class FSRSScheduler(Scheduler):
+    """FSRS-4.5 memory model: per-card stability (days until recall drops to 90%) and difficulty (1-10)"""
+    name = "fsrs"
+
+    DEFAULT_WEIGHTS = (
+        0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+        0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755
+    )
+    DECAY = -0.5
+    FACTOR = 0.9 ** (1 / DECAY) - 1
+    MAXIMUM_INTERVAL = 36500
+
+    @staticmethod
+    def rating(quality: int) -> int:
+        """Map SM-2 quality 0-5 onto FSRS ratings Again(1) / Hard(2) / Good(3) / Easy(4)"""
+        if quality < 3:
+            return 1
+        return quality - 1
+
+    def retrievability(self, elapsed_days: float, stability: float) -> float:
+        return (1 + self.FACTOR * elapsed_days / stability) ** self.DECAY
+
+    def next_interval(self, stability: float, desired_retention: float) -> int:
+        interval = stability / self.FACTOR * (desired_retention ** (1 / self.DECAY) - 1)
+        return min(max(1, round(interval)), self.MAXIMUM_INTERVAL)
+
+    def initial_difficulty(self, w, rating: int) -> float:
+        return min(max(w[4] - (rating - 3) * w[5], 1.0), 10.0)
+
+    def review(self, state: CardState, quality: int, now: datetime, config: dict) -> CardState:
+        w = config.get("weights") or self.DEFAULT_WEIGHTS
+        desired_retention = config.get("desired_retention") or 0.9
+        rating = self.rating(quality)
+
+        if state.stability is None and state.repetition_count == 0:
+            stability = w[rating - 1]
+            difficulty = self.initial_difficulty(w, rating)
+        else:
+            # Cards coming from SM-2 start from their current interval (interval == stability at 90%)
+            stability = state.stability or float(max(state.interval_days, 1))
+            difficulty = state.difficulty or self.initial_difficulty(w, 3)
+            elapsed_days = max((now - state.last_review).total_seconds() / 86400, 0) if state.last_review else 0
+            recall = self.retrievability(elapsed_days, stability)
+
+            if rating == 1:
+                stability = (
+                    w[11] * difficulty ** -w[12] * ((stability + 1) ** w[13] - 1) * math.exp(w[14] * (1 - recall))
+                )
+            else:
+                hard_penalty = w[15] if rating == 2 else 1.0
+                easy_bonus = w[16] if rating == 4 else 1.0
+                stability = stability * (
+                    math.exp(w[8]) * (11 - difficulty) * stability ** -w[9]
+                    * (math.exp(w[10] * (1 - recall)) - 1) * hard_penalty * easy_bonus + 1
+                )
+            difficulty = difficulty - w[6] * (rating - 3)
+            difficulty = w[7] * self.initial_difficulty(w, 3) + (1 - w[7]) * difficulty
+            difficulty = min(max(difficulty, 1.0), 10.0)
+
+        stability = max(stability, 0.01)
+        interval = self.next_interval(stability, desired_retention)
+        if rating == 1:
+            new_status = CardStatus.RELEARNING
+            new_repetition = 0
+        else:
+            new_status = CardStatus.LEARNING if state.repetition_count == 0 else CardStatus.REVIEW
+            new_repetition = state.repetition_count + 1
+
+        return replace(
+            state,
+            interval_days=interval,
+            repetition_count=new_repetition,
+            status=new_status,
+            stability=stability,
+            difficulty=difficulty,
+            last_review=now,
+            next_review=now + timedelta(days=interval)
+        )
+
+
+SCHEDULERS: Dict[str, Scheduler] = {
+    SM2Scheduler.name: SM2Scheduler(),
+    FSRSScheduler.name: FSRSScheduler(),
+}
+
+
+def get_scheduler(name: Optional[str]) -> Scheduler:
+    scheduler = SCHEDULERS.get(name or SM2Scheduler.name)
+    if not scheduler:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown scheduler: {name}"
+        )
+    return scheduler
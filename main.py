@@ -1,17 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1 import api_router
-from app.core.database import Base, engine
+from app.core.database import Base, engine, SessionLocal
+from app.services.review_log_buffer import (
+    get_review_log_buffer, start_review_log_buffer, stop_review_log_buffer
+)
 
 
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.REVIEW_LOG_BUFFER_ENABLED:
+        start_review_log_buffer(
+            SessionLocal,
+            max_rows=settings.REVIEW_LOG_BUFFER_MAX_ROWS,
+            max_delay_ms=settings.REVIEW_LOG_BUFFER_MAX_DELAY_MS,
+            max_pending=settings.REVIEW_LOG_BUFFER_MAX_PENDING
+        )
+    yield
+    # Writes out whatever is still queued before the process exits
+    stop_review_log_buffer()
+
+
 app = FastAPI(
     title="Flashcard Learning System API",
     description="Backend API for Flashcard Learning System",
     version="1.0.0",
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -21,6 +41,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Rescheduled-Cards"],
 )
 
 # Include routers
@@ -36,3 +57,10 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/metrics/review-log-buffer")
+async def review_log_buffer_metrics():
+    buffer = get_review_log_buffer()
+    if not buffer:
+        return {"enabled": False}
+    return {"enabled": True, **buffer.metrics()}
@@ -0,0 +1,94 @@
+"""Time bulk rescheduling of one user's cards after an AlgoConfigs change.
+
+Usage:
+    python -m scripts.bench_reschedule --cards 100000
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("DEBUG", "False")
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.database import Base  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.deck import Deck, Flashcard  # noqa: E402
+from app.models.learning import CardRetentionData, ReviewLogs, CardStatus  # noqa: E402
+from app.services.learning_service import LearningService  # noqa: E402
+
+
+def seed(db, cards, rng):
+    db.add(User(id=1, username="bench", email="bench@bench.local", password_hash="x"))
+    db.add(Deck(id=1, owner_id=1, title="Bench deck"))
+    db.flush()
+    now = datetime.utcnow()
+    db.execute(insert(Flashcard), [
+        {"id": i, "deck_id": 1, "front_content": "Q", "back_content": "A"} for i in range(1, cards + 1)
+    ])
+    retention = []
+    logs = []
+    for card_id in range(1, cards + 1):
+        repetitions = rng.randint(1, 8)
+        last_review = now - timedelta(days=rng.randint(0, 60))
+        interval = 1 if repetitions == 1 else 6 if repetitions == 2 else rng.randint(7, 200)
+        retention.append({
+            "user_id": 1, "card_id": card_id, "interval_days": interval, "ease_factor": 2.5,
+            "repetition_count": repetitions, "last_review": last_review,
+            "next_review": last_review + timedelta(days=interval),
+            "status": CardStatus.LEARNING if repetitions == 1 else CardStatus.REVIEW
+        })
+        logs.append({
+            "user_id": 1, "card_id": card_id, "quality": rng.choice((3, 4, 5)),
+            "study_time_ms": 1000, "reviewed_at": last_review
+        })
+    db.execute(insert(CardRetentionData), retention)
+    db.execute(insert(ReviewLogs), logs)
+    db.commit()
+
+
+def run(cards):
+    engine = create_engine(
+        os.environ.get("BENCH_DATABASE_URL", "sqlite://"),
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    seed(db, cards, random.Random(42))
+
+    old = {"interval_modifier": 1.0, "easy_bonus": 1.3, "hard_interval": 1.2}
+    rng = np.random.default_rng(42)
+    started = time.perf_counter()
+    LearningService.calculate_next_review_batch(
+        rng.integers(0, 6, cards), np.full(cards, 2.5), rng.integers(1, 200, cards),
+        rng.integers(0, 8, cards), {**old, "interval_modifier": 1.2}
+    )
+    elapsed = time.perf_counter() - started
+    print(f"{'vectorized SM-2 only (no database)':<45} {cards:>8} cards {'':>16} {elapsed * 1000:>9.1f} ms")
+
+    for label, new in (
+        ("interval_modifier 1.0 -> 1.2", {**old, "interval_modifier": 1.2}),
+        ("easy_bonus 1.3 -> 1.5 (reads last quality)", {**old, "easy_bonus": 1.5}),
+    ):
+        started = time.perf_counter()
+        changed = LearningService.reschedule_cards(db, 1, old, new)
+        db.commit()
+        elapsed = time.perf_counter() - started
+        print(f"{label:<45} {cards:>8} cards {changed:>8} changed {elapsed * 1000:>9.1f} ms")
+        old = new
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.cards)
@@ -0,0 +1,166 @@
+"""Count database round-trips and commits per review.
+
+Compares the previous commit-per-repository review flow with the current
+single unit-of-work ``LearningService.review_card`` and the batch endpoint.
+
+Usage:
+    python -m scripts.bench_review_roundtrips --reviews 200
+"""
+import argparse
+import os
+import time
+from datetime import datetime, date
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("DEBUG", "False")
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.core.database import Base  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.deck import Deck, Flashcard  # noqa: E402
+from app.models.learning import CardStatus  # noqa: E402
+from app.repositories.learning_repository import (  # noqa: E402
+    CardRetentionDataRepository, ReviewLogsRepository,
+    UserStatsRepository, AlgoConfigsRepository
+)
+from app.schemas.learning import (  # noqa: E402
+    CardRetentionDataCreate, CardRetentionDataUpdate, ReviewLogCreate, ReviewItem
+)
+from app.services.learning_service import LearningService  # noqa: E402
+
+
+class RoundTripCounter:
+    def __init__(self, engine):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_execute(self, *args):
+        self.statements += 1
+
+    def _on_commit(self, *args):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = 0
+        self.commits = 0
+
+
+def legacy_review_card(db, user_id, card_id, quality, study_time_ms):
+    """review_card as it ran before the single-transaction change"""
+    retention = CardRetentionDataRepository.get_by_user_and_card(db, user_id, card_id)
+    if not retention:
+        algo_config = AlgoConfigsRepository.get_by_user(db, user_id)
+        if not algo_config:
+            algo_config = AlgoConfigsRepository.create_or_update(db, user_id)
+        retention = CardRetentionDataRepository.create_or_update(db, CardRetentionDataCreate(
+            user_id=user_id, card_id=card_id,
+            ease_factor=algo_config.starting_ease, status=CardStatus.NEW
+        ))
+    previous_status = retention.status
+
+    algo_config = AlgoConfigsRepository.get_by_user(db, user_id)
+    if not algo_config:
+        algo_config = AlgoConfigsRepository.create_or_update(db, user_id)
+    algo_dict = {
+        "interval_modifier": algo_config.interval_modifier,
+        "easy_bonus": algo_config.easy_bonus,
+        "hard_interval": algo_config.hard_interval
+    }
+    next_review, new_interval, new_ease, new_repetition, new_status = LearningService.calculate_next_review(
+        quality, retention.ease_factor, retention.interval_days, retention.repetition_count, algo_dict
+    )
+    CardRetentionDataRepository.update(db, user_id, card_id, CardRetentionDataUpdate(
+        next_review=next_review, last_review=datetime.utcnow(), interval_days=new_interval,
+        ease_factor=new_ease, repetition_count=new_repetition, status=new_status
+    ))
+    ReviewLogsRepository.create(db, ReviewLogCreate(
+        user_id=user_id, card_id=card_id, quality=quality, study_time_ms=study_time_ms
+    ))
+    stats = UserStatsRepository.update_streak(db, user_id, date.today())
+    if new_status == CardStatus.REVIEW and previous_status != CardStatus.REVIEW:
+        stats.cards_learned += 1
+        stats.total_xp += 10
+        db.commit()
+
+
+def seed(session_factory, username, card_count):
+    db = session_factory()
+    user = User(username=username, email=f"{username}@bench.local", password_hash="x")
+    db.add(user)
+    db.flush()
+    deck = Deck(owner_id=user.id, title="Bench deck")
+    db.add(deck)
+    db.flush()
+    cards = [Flashcard(deck_id=deck.id, front_content=f"Q{i}", back_content=f"A{i}") for i in range(card_count)]
+    db.add_all(cards)
+    db.commit()
+    ids = user.id, [c.id for c in cards]
+    db.close()
+    return ids
+
+
+def run(reviews, batch_size):
+    engine = create_engine(
+        os.environ.get("BENCH_DATABASE_URL", "sqlite://"),
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    counter = RoundTripCounter(engine)
+
+    def review_single(fn, username):
+        user_id, card_ids = seed(session_factory, username, reviews)
+        db = session_factory()
+        counter.reset()
+        started = time.perf_counter()
+        # Every card is reviewed twice: once as a new card, once as a known one
+        for quality in (4, 5):
+            for card_id in card_ids:
+                fn(db, user_id, card_id, quality, 1000)
+        elapsed = time.perf_counter() - started
+        db.close()
+        return 2 * len(card_ids), elapsed
+
+    def review_batched(username):
+        user_id, card_ids = seed(session_factory, username, reviews)
+        db = session_factory()
+        counter.reset()
+        started = time.perf_counter()
+        for quality in (4, 5):
+            for i in range(0, len(card_ids), batch_size):
+                items = [
+                    ReviewItem(card_id=card_id, quality=quality, study_time_ms=1000)
+                    for card_id in card_ids[i:i + batch_size]
+                ]
+                LearningService.review_cards_batch(db, user_id, items)
+        elapsed = time.perf_counter() - started
+        db.close()
+        return 2 * len(card_ids), elapsed
+
+    rows = []
+    for label, runner in (
+        ("before: commit per repository", lambda: review_single(legacy_review_card, "legacy")),
+        ("after: unit of work", lambda: review_single(LearningService.review_card, "uow")),
+        (f"after: batch of {batch_size}", lambda: review_batched("batch")),
+    ):
+        count, elapsed = runner()
+        rows.append((label, count, counter.statements / count, counter.commits / count, elapsed * 1000 / count))
+
+    print(f"{'path':<32} {'reviews':>8} {'stmts/review':>13} {'commits/review':>15} {'ms/review':>10}")
+    for label, count, statements, commits, ms in rows:
+        print(f"{label:<32} {count:>8} {statements:>13.2f} {commits:>15.2f} {ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reviews", type=int, default=200, help="cards per user, each reviewed twice")
+    parser.add_argument("--batch-size", type=int, default=25)
+    args = parser.parse_args()
+    run(args.reviews, args.batch_size)
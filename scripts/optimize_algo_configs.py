@@ -0,0 +1,211 @@
+"""Fit per-user SM-2 parameters (starting_ease, interval_modifier) from review_logs.
+
+Each user's history is replayed through SM-2 for every point of a parameter
+grid at once (NumPy, cards x grid). A scheduled interval is read as "recall
+drops to 90% after this many days", so a review after ``elapsed`` days is
+predicted to pass with probability 0.9 ** (elapsed / interval). The grid point
+with the lowest log loss against the observed pass/fail (quality >= 3) wins.
+
+Histories are streamed from the database one user at a time and fitted in a
+process pool; results are written back in bulk. Progress is checkpointed to
+``--state-file`` after every committed chunk (the last finished user_id), so
+an interrupted run continues where it stopped. Pass ``--restart`` to ignore it.
+
+Usage:
+    python -m scripts.optimize_algo_configs --workers 8
+    python -m scripts.optimize_algo_configs --dry-run --limit-users 1000
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.core.database import SessionLocal
+from app.repositories.learning_repository import ReviewLogsRepository, AlgoConfigsRepository
+from app.services.learning_service import LearningService
+
+STARTING_EASE_GRID = np.round(np.arange(1.3, 3.51, 0.1), 2)
+INTERVAL_MODIFIER_GRID = np.round(np.arange(0.5, 2.51, 0.1), 2)
+DEFAULT_EASY_BONUS = 1.3
+TARGET_RECALL = 0.9
+# Bounds the (cards x grid) working arrays to a few tens of MB per worker
+CARD_BLOCK = 1024
+
+
+def pack_history(rows):
+    """Compact arrays for one user's reviews: cheap to pickle to a worker"""
+    card_ids, quality, reviewed_at = zip(*rows)
+    return (
+        np.array(card_ids, dtype=np.int64),
+        np.array(quality, dtype=np.int8),
+        np.array(reviewed_at, dtype="datetime64[s]").astype(np.int64) / 86400.0,
+    )
+
+
+def card_matrix(card_ids, quality, days):
+    """(cards, max_reviews) quality/day matrices plus a mask of real reviews"""
+    order = np.lexsort((days, card_ids))
+    card_ids, quality, days = card_ids[order], quality[order], days[order]
+    starts = np.flatnonzero(np.r_[True, card_ids[1:] != card_ids[:-1]])
+    lengths = np.diff(np.r_[starts, len(card_ids)])
+    position = np.arange(len(card_ids)) - np.repeat(starts, lengths)
+    row = np.repeat(np.arange(len(starts)), lengths)
+
+    shape = (len(starts), lengths.max())
+    quality_matrix = np.zeros(shape, dtype=np.int64)
+    day_matrix = np.zeros(shape)
+    mask = np.zeros(shape, dtype=bool)
+    quality_matrix[row, position] = quality
+    day_matrix[row, position] = days
+    mask[row, position] = True
+    return quality_matrix, day_matrix, mask
+
+
+def replay_loss(quality, days, mask, starting_ease, interval_modifier, easy_bonus):
+    """Summed log loss and number of predicted reviews for each grid point"""
+    cards, steps = quality.shape
+    grid = starting_ease.shape[0]
+    config = {"interval_modifier": interval_modifier, "easy_bonus": easy_bonus}
+    ease = np.broadcast_to(starting_ease, (cards, grid)).copy()
+    interval = np.zeros((cards, grid))
+    repetitions = np.zeros((cards, grid), dtype=np.int64)
+    loss = np.zeros(grid)
+    predicted = 0
+
+    for step in range(steps - 1):
+        active = mask[:, step]
+        q = np.broadcast_to(quality[active, step][:, None], (active.sum(), grid))
+        new_interval, new_ease, new_repetitions, _ = LearningService.calculate_next_review_batch(
+            q, ease[active], interval[active], repetitions[active], config
+        )
+        interval[active], ease[active], repetitions[active] = new_interval, new_ease, new_repetitions
+
+        scored = mask[:, step + 1]
+        if not scored.any():
+            continue
+        elapsed = (days[scored, step + 1] - days[scored, step])[:, None]
+        recall = np.clip(TARGET_RECALL ** (elapsed / np.maximum(interval[scored], 1)), 1e-4, 1 - 1e-4)
+        passed = (quality[scored, step + 1] >= 3)[:, None]
+        loss -= np.where(passed, np.log(recall), np.log1p(-recall)).sum(axis=0)
+        predicted += int(scored.sum())
+    return loss, predicted
+
+
+def fit_user(user_id, history, min_reviews):
+    """Best (starting_ease, interval_modifier) for one user, or None if there is too little history"""
+    quality, days, mask = card_matrix(*history)
+    if mask[:, 1:].sum() < min_reviews:
+        return user_id, None
+
+    ease_grid, modifier_grid = (axis.ravel() for axis in np.meshgrid(STARTING_EASE_GRID, INTERVAL_MODIFIER_GRID))
+    loss = np.zeros(ease_grid.shape[0])
+    predicted = 0
+    for block in range(0, quality.shape[0], CARD_BLOCK):
+        block_loss, block_predicted = replay_loss(
+            quality[block:block + CARD_BLOCK], days[block:block + CARD_BLOCK], mask[block:block + CARD_BLOCK],
+            ease_grid, modifier_grid, DEFAULT_EASY_BONUS
+        )
+        loss += block_loss
+        predicted += block_predicted
+
+    best = int(np.argmin(loss))
+    return user_id, {
+        "starting_ease": float(ease_grid[best]),
+        "interval_modifier": float(modifier_grid[best]),
+        "log_loss": float(loss[best] / predicted),
+    }
+
+
+def fit_chunk(users, min_reviews):
+    return [fit_user(user_id, history, min_reviews) for user_id, history in users]
+
+
+def user_histories(db, after_user_id, limit_users):
+    rows = ReviewLogsRepository.stream_history(db, after_user_id)
+    grouped = itertools.groupby(rows, key=lambda row: row[0])
+    for user_id, user_rows in itertools.islice(grouped, limit_users):
+        yield user_id, pack_history([row[1:] for row in user_rows])
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)["last_user_id"]
+
+
+def save_checkpoint(path, last_user_id):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"last_user_id": last_user_id}, f)
+    os.replace(tmp, path)
+
+
+def run(args):
+    after_user_id = None if args.restart else load_checkpoint(args.state_file)
+    if after_user_id is not None:
+        print(f"resuming after user_id {after_user_id}")
+
+    read_db = SessionLocal()
+    write_db = SessionLocal()
+    totals = {"processed": 0, "fitted": 0}
+    started = time.perf_counter()
+
+    def write_back(last_user_id, results):
+        rows = [
+            {"user_id": user_id, "starting_ease": fit["starting_ease"], "interval_modifier": fit["interval_modifier"]}
+            for user_id, fit in results if fit
+        ]
+        if not args.dry_run:
+            AlgoConfigsRepository.bulk_save(write_db, rows)
+            save_checkpoint(args.state_file, last_user_id)
+        totals["processed"] += len(results)
+        totals["fitted"] += len(rows)
+        rate = totals["processed"] / (time.perf_counter() - started)
+        print(f"users {totals['processed']:>9}  fitted {totals['fitted']:>9}  {rate:>8.1f} users/s", flush=True)
+
+    try:
+        chunks = chunked(user_histories(read_db, after_user_id, args.limit_users), args.chunk_size)
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            # A bounded queue of in-flight chunks, drained in submission (= user_id) order: the stream is
+            # never read far ahead of the pool, and the checkpoint is always a safe resume point
+            pending = deque()
+            for chunk in chunks:
+                pending.append((chunk[-1][0], pool.submit(fit_chunk, chunk, args.min_reviews)))
+                while len(pending) > args.workers * 2:
+                    last_user_id, future = pending.popleft()
+                    write_back(last_user_id, future.result())
+            while pending:
+                last_user_id, future = pending.popleft()
+                write_back(last_user_id, future.result())
+    finally:
+        read_db.close()
+        write_db.close()
+
+    processed, fitted = totals["processed"], totals["fitted"]
+    elapsed = time.perf_counter() - started
+    print(f"done: {processed} users ({fitted} fitted, {processed - fitted} with too little history) "
+          f"in {elapsed:.1f}s, {processed / max(elapsed, 1e-9):.1f} users/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=50, help="users per worker task and per bulk write")
+    parser.add_argument("--min-reviews", type=int, default=50, help="repeat reviews needed before fitting a user")
+    parser.add_argument("--limit-users", type=int, default=None)
+    parser.add_argument("--state-file", default=".optimize_algo_configs.json")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start from the first user")
+    parser.add_argument("--dry-run", action="store_true", help="fit and report without writing configs")
+    run(parser.parse_args())
@@ -0,0 +1,508 @@
+from fastapi import status
+
+
+def auth_header(client, username, role="STUDENT"):
+    client.post(
+        "/api/v1/auth/register",
+        json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": "password123",
+            "role": role,
+        },
+    )
+    login = client.post(
+        "/api/v1/auth/login",
+        json={"username": username, "password": "password123"},
+    )
+    token = login.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_deck_with_cards(client, headers, count):
+    deck = client.post(
+        "/api/v1/decks/",
+        headers=headers,
+        json={"title": "Chemistry", "description": "Elements", "is_public": False},
+    ).json()
+    card_ids = []
+    for i in range(count):
+        fc = client.post(
+            f"/api/v1/decks/{deck['id']}/flashcards",
+            headers=headers,
+            json={
+                "deck_id": deck["id"],
+                "front_content": f"Element {i}",
+                "back_content": f"Symbol {i}",
+            },
+        )
+        assert fc.status_code == status.HTTP_201_CREATED, fc.text
+        card_ids.append(fc.json()["id"])
+    return deck["id"], card_ids
+
+
+def test_batch_review(client):
+    headers = auth_header(client, "batchuser")
+    _, card_ids = create_deck_with_cards(client, headers, 3)
+
+    resp = client.post(
+        "/api/v1/learning/review/batch",
+        headers=headers,
+        json={
+            "reviews": [
+                {"card_id": card_ids[0], "quality": 4, "study_time_ms": 1200},
+                {"card_id": card_ids[1], "quality": 1, "study_time_ms": 3000},
+                {"card_id": card_ids[0], "quality": 5, "study_time_ms": 800},
+                {"card_id": 999999, "quality": 4, "study_time_ms": 500},
+            ]
+        },
+    )
+    assert resp.status_code == status.HTTP_200_OK, resp.text
+    data = resp.json()
+    assert data["reviewed"] == 3
+    assert data["failed"] == 1
+
+    results = data["results"]
+    assert results[0]["status"] == "LEARNING"
+    assert results[1]["status"] == "RELEARNING"
+    # Second review of the same card builds on the first one
+    assert results[2]["status"] == "REVIEW"
+    assert results[2]["repetition_count"] == 2
+    assert results[3]["success"] is False
+
+    logs = client.get("/api/v1/learning/review-logs", headers=headers).json()
+    assert len(logs) == 3
+
+    progress = client.get("/api/v1/learning/progress", headers=headers).json()
+    assert progress["user_stats"]["cards_learned"] == 1
+    assert progress["user_stats"]["current_streak"] == 1
+    assert progress["cards_mastered"] == 1
+    assert progress["cards_in_learning"] == 0
+    assert progress["cards_due_today"] == 0
+
+
+def test_review_card_commits_once(client):
+    from sqlalchemy import event
+    from tests.conftest import TestingSessionLocal, engine
+    from app.services.learning_service import LearningService
+
+    headers = auth_header(client, "uowuser")
+    _, card_ids = create_deck_with_cards(client, headers, 1)
+    user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+
+    commits = []
+
+    def on_commit(conn):
+        commits.append(conn)
+
+    event.listen(engine, "commit", on_commit)
+    db = TestingSessionLocal()
+    try:
+        result = LearningService.review_card(db, user_id, card_ids[0], 4, 1000)
+    finally:
+        db.close()
+        event.remove(engine, "commit", on_commit)
+
+    assert result["status"] == "LEARNING"
+    assert len(commits) == 1
+
+
+def test_due_cards_keyset_pagination(client):
+    headers = auth_header(client, "dueuser")
+    _, card_ids = create_deck_with_cards(client, headers, 5)
+    # quality 0 schedules every card for tomorrow; pull them back to now
+    client.post(
+        "/api/v1/learning/review/batch",
+        headers=headers,
+        json={"reviews": [{"card_id": c, "quality": 0, "study_time_ms": 100} for c in card_ids]},
+    )
+    from datetime import datetime, timedelta
+    from tests.conftest import TestingSessionLocal
+    from app.models.learning import CardRetentionData
+
+    db = TestingSessionLocal()
+    for i, retention in enumerate(db.query(CardRetentionData).filter(CardRetentionData.card_id.in_(card_ids))):
+        retention.next_review = datetime.utcnow() - timedelta(hours=1 + i % 2)
+    db.commit()
+    db.close()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/api/v1/learning/due-cards", headers=headers, params=params)
+        assert resp.status_code == status.HTTP_200_OK, resp.text
+        page = resp.json()
+        assert len(page) <= 2
+        seen.extend(page)
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert sorted(c["card_id"] for c in seen) == sorted(card_ids)
+    keys = [(c["next_review"], c["card_id"]) for c in seen]
+    assert keys == sorted(keys)
+
+    bad = client.get("/api/v1/learning/due-cards", headers=headers, params={"cursor": "nope"})
+    assert bad.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_due_cards_query_uses_index():
+    from datetime import datetime
+    from sqlalchemy import event
+    from tests.conftest import TestingSessionLocal, engine
+    from app.repositories.learning_repository import CardRetentionDataRepository
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    db = TestingSessionLocal()
+    try:
+        CardRetentionDataRepository.get_due_cards(db, 1, 50, (datetime.utcnow(), 1))
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    statement, parameters = captured[-1]
+    plan = db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+    db.close()
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_card_retention_data_user_next_review" in details
+    assert "TEMP B-TREE" not in details
+
+
+def test_batch_calculation_matches_scalar():
+    import itertools
+    import numpy as np
+    from app.services.learning_service import LearningService
+
+    config = {"interval_modifier": 1.15, "easy_bonus": 1.4, "hard_interval": 1.2}
+    grid = list(itertools.product(range(6), [1.3, 1.7, 2.5, 2.9], [0, 1, 6, 15, 40], [0, 1, 2, 5]))
+    quality, ease, interval, reps = (np.array(col) for col in zip(*grid))
+
+    new_interval, new_ease, new_reps, new_status = LearningService.calculate_next_review_batch(
+        quality, ease, interval, reps, config
+    )
+    for i, args in enumerate(grid):
+        _, s_interval, s_ease, s_reps, s_status = LearningService.calculate_next_review(*args, config)
+        assert new_interval[i] == s_interval
+        assert new_ease[i] == s_ease
+        assert new_reps[i] == s_reps
+        assert new_status[i] == s_status
+
+
+def test_reschedule_on_algo_config_change(client):
+    headers = auth_header(client, "rescheduser")
+    _, card_ids = create_deck_with_cards(client, headers, 1)
+    for quality in (4, 4, 4):
+        client.post(
+            "/api/v1/learning/review/batch",
+            headers=headers,
+            json={"reviews": [{"card_id": card_ids[0], "quality": quality, "study_time_ms": 100}]},
+        )
+
+    before = client.get("/api/v1/learning/due-cards", headers=headers)
+    assert before.json() == []
+
+    # Without reschedule nothing moves
+    resp = client.put("/api/v1/learning/algo-config", headers=headers, json={"interval_modifier": 1.0})
+    assert resp.status_code == status.HTTP_200_OK, resp.text
+
+    resp = client.put(
+        "/api/v1/learning/algo-config",
+        headers=headers,
+        params={"reschedule": "true"},
+        json={"interval_modifier": 2.0},
+    )
+    assert resp.status_code == status.HTTP_200_OK, resp.text
+    assert resp.json()["interval_modifier"] == 2.0
+    assert resp.headers["X-Rescheduled-Cards"] == "1"
+
+    from tests.conftest import TestingSessionLocal
+    from app.models.learning import CardRetentionData
+
+    db = TestingSessionLocal()
+    retention = db.query(CardRetentionData).filter(CardRetentionData.card_id == card_ids[0]).one()
+    db.close()
+    # Third pass: int(6 * ease) days before, now doubled by the modifier
+    assert retention.interval_days in (30, 32)
+    assert (retention.next_review - retention.last_review).days == retention.interval_days
+
+
+def test_optimizer_fits_and_bulk_saves_algo_configs(client):
+    import random
+    from datetime import datetime, timedelta
+    from scripts.optimize_algo_configs import fit_user, pack_history
+    from tests.conftest import TestingSessionLocal
+    from app.repositories.learning_repository import AlgoConfigsRepository
+
+    def history(memory, seed):
+        # Learner who recalls with p = 0.9 ** (elapsed / (memory * interval)) reviewing on SM-2 defaults
+        rng = random.Random(seed)
+        rows = []
+        for card_id in range(1, 101):
+            at = datetime(2026, 1, 1) + timedelta(days=rng.randint(0, 30))
+            interval, ease, reps = 1, 2.5, 0
+            for _ in range(8):
+                gap = interval * rng.uniform(0.6, 1.6)
+                at += timedelta(days=gap)
+                quality = 4 if rng.random() < 0.9 ** (gap / (interval * memory)) else 1
+                rows.append((card_id, quality, at))
+                if quality < 3:
+                    interval, ease, reps = 1, max(1.3, ease - 0.2), 0
+                else:
+                    interval = 1 if reps == 0 else 6 if reps == 1 else int(interval * ease)
+                    reps += 1
+        return pack_history(rows)
+
+    _, weak = fit_user(1, history(0.6, 1), min_reviews=50)
+    _, strong = fit_user(2, history(2.0, 2), min_reviews=50)
+    assert strong["starting_ease"] * strong["interval_modifier"] > weak["starting_ease"] * weak["interval_modifier"]
+    assert fit_user(3, pack_history([(1, 4, datetime(2026, 1, 1))]), min_reviews=50) == (3, None)
+
+    headers = auth_header(client, "optimizeuser")
+    user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+    client.put("/api/v1/learning/algo-config", headers=headers, json={"easy_bonus": 1.5})
+    other_id = client.get("/api/v1/users/me", headers=auth_header(client, "optimizeuser2")).json()["id"]
+
+    db = TestingSessionLocal()
+    rows = [
+        {"user_id": user_id, "starting_ease": weak["starting_ease"], "interval_modifier": weak["interval_modifier"]},
+        {"user_id": other_id, "starting_ease": strong["starting_ease"], "interval_modifier": strong["interval_modifier"]},
+    ]
+    assert AlgoConfigsRepository.bulk_save(db, rows) == 2
+    updated = AlgoConfigsRepository.get_by_user(db, user_id)
+    inserted = AlgoConfigsRepository.get_by_user(db, other_id)
+    db.close()
+    assert (updated.starting_ease, updated.easy_bonus) == (weak["starting_ease"], 1.5)
+    assert (inserted.interval_modifier, inserted.scheduler) == (strong["interval_modifier"], "sm2")
+
+
+def test_forecast_per_user_and_class(client):
+    from datetime import datetime, timedelta
+    from tests.conftest import TestingSessionLocal
+    from app.models.learning import CardRetentionData
+
+    headers = auth_header(client, "forecastuser")
+    deck_id, card_ids = create_deck_with_cards(client, headers, 4)
+    client.post(
+        "/api/v1/learning/review/batch",
+        headers=headers,
+        json={"reviews": [{"card_id": c, "quality": 4, "study_time_ms": 100} for c in card_ids]},
+    )
+    # One overdue card, one due today, two due in three days
+    db = TestingSessionLocal()
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    offsets = [timedelta(days=-2), timedelta(hours=1), timedelta(days=3, hours=2), timedelta(days=3, hours=5)]
+    for card_id, offset in zip(card_ids, offsets):
+        retention = db.query(CardRetentionData).filter(CardRetentionData.card_id == card_id).one()
+        retention.next_review = today + offset
+    db.commit()
+    db.close()
+
+    resp = client.get("/api/v1/learning/forecast", headers=headers, params={"days": 7})
+    assert resp.status_code == status.HTTP_200_OK, resp.text
+    forecast = resp.json()
+    assert forecast["overdue"] == 1
+    assert [day["due"] for day in forecast["days"]] == [1, 0, 0, 2, 0, 0, 0]
+    assert forecast["days"][0]["date"] == today.date().isoformat()
+    assert forecast["total"] == 4
+
+    teacher = auth_header(client, "forecastteacher", role="TEACHER")
+    class_obj = client.post("/api/v1/classes/", headers=teacher, json={"name": "Chem 101"}).json()
+    client.post(f"/api/v1/classes/{class_obj['id']}/decks", headers=teacher, params={"deck_id": deck_id})
+    client.post("/api/v1/classes/join", headers=headers, params={"invite_code": class_obj["invite_code"]})
+
+    resp = client.get(f"/api/v1/classes/{class_obj['id']}/forecast", headers=teacher, params={"days": 2})
+    assert resp.status_code == status.HTTP_200_OK, resp.text
+    assert resp.json()["overdue"] == 1
+    assert [day["due"] for day in resp.json()["days"]] == [1, 0]
+
+    outsider = auth_header(client, "forecastoutsider")
+    resp = client.get(f"/api/v1/classes/{class_obj['id']}/forecast", headers=outsider)
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_study_session_returns_content_in_one_request(client):
+    from datetime import datetime, timedelta
+    from sqlalchemy import event
+    from tests.conftest import TestingSessionLocal, engine
+    from app.models.learning import CardRetentionData
+
+    headers = auth_header(client, "sessionuser")
+    deck_id, card_ids = create_deck_with_cards(client, headers, 5)
+    client.post(
+        "/api/v1/learning/review/batch",
+        headers=headers,
+        json={"reviews": [{"card_id": c, "quality": 0, "study_time_ms": 100} for c in card_ids[:2]]},
+    )
+    db = TestingSessionLocal()
+    for retention in db.query(CardRetentionData).filter(CardRetentionData.card_id.in_(card_ids[:2])):
+        retention.next_review = datetime.utcnow() - timedelta(hours=1)
+    db.commit()
+    db.close()
+
+    statements = []
+
+    def count(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        resp = client.get("/api/v1/learning/study-session", headers=headers, params={"limit": 10, "new_cards": 2})
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert resp.status_code == status.HTTP_200_OK, resp.text
+    session = resp.json()
+    # Current user, due cards joined with content, new cards
+    assert len(statements) == 3
+
+    assert (session["due_count"], session["new_count"]) == (2, 2)
+    cards = {card["card_id"]: card for card in session["cards"]}
+    assert set(cards) == set(card_ids[:4])
+    assert cards[card_ids[0]]["is_new"] is False
+    assert cards[card_ids[0]]["status"] == "RELEARNING"
+    assert cards[card_ids[2]]["is_new"] is True
+    assert cards[card_ids[2]]["front_content"] == "Element 2"
+    assert cards[card_ids[3]]["back_content"] == "Symbol 3"
+
+    resp = client.get(
+        "/api/v1/learning/study-session", headers=headers, params={"deck_id": deck_id + 1000, "new_cards": 5}
+    )
+    assert resp.json()["cards"] == []
+
+
+def test_offline_sync_is_idempotent(client):
+    import uuid
+    from datetime import datetime, timedelta
+
+    headers = auth_header(client, "syncuser")
+    _, card_ids = create_deck_with_cards(client, headers, 2)
+    start = datetime.utcnow() - timedelta(days=10)
+    ids = [str(uuid.uuid4()) for _ in range(4)]
+    # Sent out of order: the card's reviews must be applied by client timestamp
+    reviews = [
+        {"client_review_id": ids[2], "card_id": card_ids[0], "quality": 4, "study_time_ms": 100,
+         "reviewed_at": (start + timedelta(days=7)).isoformat()},
+        {"client_review_id": ids[0], "card_id": card_ids[0], "quality": 4, "study_time_ms": 100,
+         "reviewed_at": start.isoformat()},
+        {"client_review_id": ids[1], "card_id": card_ids[0], "quality": 4, "study_time_ms": 100,
+         "reviewed_at": (start + timedelta(days=1)).isoformat()},
+        {"client_review_id": ids[3], "card_id": 999999, "quality": 4, "study_time_ms": 100,
+         "reviewed_at": start.isoformat()},
+    ]
+
+    resp = client.post("/api/v1/learning/sync", headers=headers, json={"reviews": reviews})
+    assert resp.status_code == status.HTTP_200_OK, resp.text
+    data = resp.json()
+    assert (data["accepted"], data["duplicates"]) == (3, 0)
+    assert [error["client_review_id"] for error in data["failed"]] == [ids[3]]
+    assert len(data["changed"]) == 1
+    changed = data["changed"][0]
+    assert changed["card_id"] == card_ids[0]
+    assert changed["status"] == "REVIEW"
+    assert changed["repetition_count"] == 3
+    assert changed["last_review"].startswith((start + timedelta(days=7)).date().isoformat())
+
+    # A retry of the same queue (plus one new review) only applies the new one
+    reviews.append({"client_review_id": str(uuid.uuid4()), "card_id": card_ids[1], "quality": 5,
+                    "study_time_ms": 100, "reviewed_at": datetime.utcnow().isoformat()})
+    resp = client.post("/api/v1/learning/sync", headers=headers, json={"reviews": reviews + reviews[:1]})
+    data = resp.json()
+    assert (data["accepted"], data["duplicates"]) == (1, 4)
+    assert [c["card_id"] for c in data["changed"]] == [card_ids[1]]
+
+    logs = client.get("/api/v1/learning/review-logs", headers=headers).json()
+    assert len(logs) == 4
+    assert {log["client_review_id"] for log in logs} >= set(ids[:3])
+
+
+def test_review_log_buffer_batches_and_flushes_on_stop(client):
+    import time
+    from sqlalchemy import event
+    from tests.conftest import TestingSessionLocal, engine
+    from app.models.learning import ReviewLogs
+    from app.services import review_log_buffer
+    from app.services.learning_service import LearningService
+
+    headers = auth_header(client, "bufferuser")
+    _, card_ids = create_deck_with_cards(client, headers, 5)
+    user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+
+    inserts = []
+
+    def count_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO review_logs"):
+            inserts.append(len(parameters) if executemany else 1)
+
+    buffer = review_log_buffer.start_review_log_buffer(TestingSessionLocal, max_rows=3, max_delay_ms=60_000)
+    event.listen(engine, "before_cursor_execute", count_inserts)
+    try:
+        db = TestingSessionLocal()
+        for card_id in card_ids:
+            LearningService.review_card(db, user_id, card_id, 4, 1000)
+        db.close()
+        # The scheduling state is written synchronously, the logs are not
+        deadline = time.monotonic() + 5
+        while buffer.metrics()["rows_written"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert buffer.metrics()["rows_written"] == 3
+        assert buffer.metrics()["pending"] == 2
+    finally:
+        review_log_buffer.stop_review_log_buffer()
+        event.remove(engine, "before_cursor_execute", count_inserts)
+
+    assert inserts == [3, 2]
+    metrics = buffer.metrics()
+    assert (metrics["flushes"], metrics["rows_written"], metrics["pending"]) == (2, 5, 0)
+    assert metrics["flush_latency_ms"]["max"] is not None
+
+    db = TestingSessionLocal()
+    assert db.query(ReviewLogs).filter(ReviewLogs.user_id == user_id).count() == 5
+    db.close()
+    assert client.get("/metrics/review-log-buffer").json() == {"enabled": False}
+
+
+def test_review_logs_keyset_pagination_and_export(client):
+    import csv
+    import io
+    import json
+
+    headers = auth_header(client, "historyuser")
+    _, card_ids = create_deck_with_cards(client, headers, 5)
+    client.post(
+        "/api/v1/learning/review/batch",
+        headers=headers,
+        json={"reviews": [{"card_id": c, "quality": 4, "study_time_ms": 100 + i} for i, c in enumerate(card_ids)]},
+    )
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/api/v1/learning/review-logs", headers=headers, params=params)
+        assert resp.status_code == status.HTTP_200_OK, resp.text
+        seen.extend(resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    # Same-timestamp logs (one batch) are still split cleanly by id
+    assert [log["id"] for log in seen] == sorted((log["id"] for log in seen), reverse=True)
+    assert len(seen) == 5
+
+    resp = client.get("/api/v1/learning/review-logs/export", headers=headers)
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert [row["id"] for row in rows] == sorted(log["id"] for log in seen)
+    assert rows[0]["study_time_ms"] == 100
+
+    resp = client.get("/api/v1/learning/review-logs/export", headers=headers, params={"format": "csv"})
+    assert resp.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert len(rows) == 5
+    assert rows[-1]["card_id"] == str(card_ids[-1])
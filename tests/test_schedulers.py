@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from fastapi import status
+
+from app.models.learning import CardStatus
+from app.services.scheduler_service import CardState, FSRSScheduler, SM2Scheduler, get_scheduler
+from tests.test_learning import auth_header, create_deck_with_cards
+
+
+def test_sm2_scheduler_matches_calculate_next_review():
+    from app.services.learning_service import LearningService
+
+    config = {"interval_modifier": 1.1, "easy_bonus": 1.3, "hard_interval": 1.2}
+    now = datetime(2026, 1, 1)
+    state = CardState()
+    for quality in (4, 5, 2, 4, 3):
+        _, interval, ease, reps, card_status = LearningService.calculate_next_review(
+            quality, state.ease_factor, state.interval_days, state.repetition_count, config
+        )
+        state = SM2Scheduler().review(state, quality, now, config)
+        assert (state.interval_days, state.ease_factor, state.repetition_count, state.status) == (
+            interval, ease, reps, card_status
+        )
+        assert state.next_review == now + timedelta(days=interval)
+
+
+def test_fsrs_scheduler_grows_stability_and_resets_on_lapse():
+    scheduler = get_scheduler("fsrs")
+    config = {"desired_retention": 0.9}
+    now = datetime(2026, 1, 1)
+
+    state = scheduler.review(CardState(), 4, now, config)
+    assert state.status == CardStatus.LEARNING
+    assert state.stability == FSRSScheduler.DEFAULT_WEIGHTS[2]
+    # At 90% desired retention the interval equals the stability
+    assert state.interval_days == round(state.stability)
+
+    intervals = [state.interval_days]
+    for _ in range(3):
+        now = state.next_review
+        state = scheduler.review(state, 4, now, config)
+        intervals.append(state.interval_days)
+    assert state.status == CardStatus.REVIEW
+    assert intervals == sorted(intervals) and intervals[-1] > intervals[0]
+
+    stability = state.stability
+    lapsed = scheduler.review(state, 1, state.next_review, config)
+    assert lapsed.status == CardStatus.RELEARNING
+    assert lapsed.repetition_count == 0
+    assert lapsed.stability < stability
+    assert lapsed.difficulty > state.difficulty
+
+    # A higher target retention means shorter intervals
+    stricter = scheduler.review(state, 4, state.next_review, {"desired_retention": 0.95})
+    relaxed = scheduler.review(state, 4, state.next_review, {"desired_retention": 0.8})
+    assert stricter.interval_days < relaxed.interval_days
+
+
+def test_review_uses_scheduler_from_algo_config(client):
+    headers = auth_header(client, "fsrsuser")
+    _, card_ids = create_deck_with_cards(client, headers, 1)
+
+    resp = client.put("/api/v1/learning/algo-config", headers=headers, json={"scheduler": "fsrs"})
+    assert resp.status_code == status.HTTP_200_OK, resp.text
+    assert resp.json()["scheduler"] == "fsrs"
+
+    resp = client.post(
+        "/api/v1/learning/review/batch",
+        headers=headers,
+        json={"reviews": [{"card_id": card_ids[0], "quality": 4, "study_time_ms": 100}]},
+    )
+    assert resp.status_code == status.HTTP_200_OK, resp.text
+    # FSRS first "good" review: round(w2) days instead of SM-2's one day
+    assert resp.json()["results"][0]["interval_days"] == round(FSRSScheduler.DEFAULT_WEIGHTS[2])
+
+    bad = client.put("/api/v1/learning/algo-config", headers=headers, json={"scheduler": "leitner"})
+    assert bad.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY